@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for serving the Rail Operations & Maintenance Optimizer web application.
+
+Run from the project root (gunicorn picks up this file automatically):
+    gunicorn webapp.app:app
+"""
+import os
+
+# Bind address (override with the GUNICORN_BIND environment variable)
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:5000")
+
+# Background optimization jobs and the cached results are kept in the memory of the worker process,
+# so a single worker serves all requests (a job must be polled from the process that started it);
+# requests are handled concurrently by its threads while the solver runs in the job process
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import the application (and OR-Tools/NumPy) once in the master process before forking
+preload_app = True
+
+# Keep client connections open between requests (e.g. while the frontend polls a job)
+keepalive = 5
+
+# /api/optimize solves synchronously with a 60 second time limit
+timeout = 120
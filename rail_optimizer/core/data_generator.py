@@ -3,10 +3,29 @@ Data generator module for the Rail Operations & Maintenance Optimizer.
 
 This module provides functions to generate dummy test data for the optimization model.
 """
-import random
+import hashlib
 import json
 import os
-from typing import Dict, List, Any, Tuple, Optional
+from operator import itemgetter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Any, Set, Tuple, Optional
+
+import numpy as np
+
+from .serialization import dump_json, dump_json_sections, load_json
+
+# Default location for cached data sets (see generate_dummy_data's cache_dir)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rail_optimizer")
+
+# Route fields, in the order in which _iter_route_records unpacks the columns
+_ROUTE_KEYS = ("id", "day", "shift", "start_location", "end_location", "distance_km")
+
+# Part of the cache key; bump whenever the data generated for a given set of
+# arguments changes so that stale cached data sets are not reused
+_GENERATOR_VERSION = 1
+
+# Directories already created by this process; repeated calls (e.g. parameter
+# sweeps writing a summary per data set) skip the makedirs stat calls
+_CREATED_DIRS: Set[str] = set()
 
 def generate_dummy_data(
     num_vehicles: int = 10,
@@ -14,7 +33,9 @@ def generate_dummy_data(
     num_parkings: int = 2,
     num_routes_per_day: int = 8,
     planning_days: int = 14,
-    seed: Optional[int] = None
+    seed: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    materialize: bool = True
 ) -> Dict[str, Any]:
     """
     Generate dummy data for the Rail Operations & Maintenance Optimizer.
@@ -26,283 +47,410 @@ def generate_dummy_data(
         num_routes_per_day: Number of routes per day shift
         planning_days: Number of days in the planning horizon
         seed: Random seed for reproducibility
+        cache_dir: Directory in which generated data sets are cached, keyed by
+            the arguments above. Only used when a seed is given, since the
+            output is otherwise not reproducible. Caching is disabled if None.
+        materialize: If False, routes are returned as a single-pass iterator
+            that validates each route as it is consumed, for callers that only
+            stream them once (e.g. generate_data_summary). Ignored when a data
+            set is read from or written to the cache.
         
     Returns:
         Dictionary containing the generated data with the following keys:
         - vehicles: List of vehicle data
         - locations: Dict of depot and parking locations with capacities
         - maintenance_types: List of maintenance activity definitions
-        - routes: List of route definitions
+        - routes: List of route definitions (an iterator if materialize is False)
     """
-    if seed is not None:
-        random.seed(seed)
+    cache_path = None
+    if cache_dir is not None and seed is not None:
+        cache_path = _dummy_data_cache_path(
+            cache_dir, num_vehicles, num_depots, num_parkings, num_routes_per_day, planning_days, seed
+        )
+        try:
+            return load_json(cache_path)
+        except FileNotFoundError:
+            pass
+    
+    # Split the seed into independent child streams, one per section, so that
+    # each section is deterministic for a fixed seed and does not depend on
+    # how many samples the other sections drew (e.g. changing num_vehicles
+    # leaves the routes unchanged)
+    locations_rng, maintenance_rng, vehicles_rng, routes_rng = (
+        np.random.default_rng(child_seed) for child_seed in np.random.SeedSequence(seed).spawn(4)
+    )
     
     # Generate locations (depots and parkings)
-    locations = _generate_locations(num_depots, num_parkings)
+    locations = _generate_locations(num_depots, num_parkings, locations_rng)
     
     # Generate maintenance types (preventive and corrective)
-    maintenance_types = _generate_maintenance_types(locations)
+    preventive_types, corrective_types = _generate_maintenance_types(locations, maintenance_rng)
+    maintenance_types = preventive_types + corrective_types
     
     # Generate vehicles with initial state
-    vehicles = _generate_vehicles(num_vehicles, locations, maintenance_types)
+    vehicles = _generate_vehicles(num_vehicles, locations, preventive_types, corrective_types, vehicles_rng)
     
     # Generate routes for each day
-    routes = _generate_routes(num_routes_per_day, planning_days, locations)
+    routes = _generate_routes(num_routes_per_day, planning_days, locations, routes_rng)
     
     # Validate the generated data
-    _validate_data(vehicles, locations, maintenance_types, routes)
-    
-    return {
+    if materialize or cache_path is not None:
+        routes = list(routes)
+        _validate_data(vehicles, locations, maintenance_types, routes)
+    else:
+        # Routes are validated lazily, as the caller consumes them
+        _validate_data(vehicles, locations, maintenance_types, [])
+        routes = _validated_routes(routes, frozenset(locations))
+    
+    data = {
         "vehicles": vehicles,
         "locations": locations,
         "maintenance_types": maintenance_types,
         "routes": routes
     }
+    
+    if cache_path is not None:
+        # dump_json writes atomically, so concurrent readers never see a partially written data set
+        _ensure_dir(cache_dir)
+        dump_json(data, cache_path)
+    
+    return data
 
-def _generate_locations(num_depots: int, num_parkings: int) -> Dict[str, Dict[str, Any]]:
+def _ensure_dir(path: str) -> None:
+    """Create a directory unless this process has already created it."""
+    if path not in _CREATED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_DIRS.add(path)
+
+def _dummy_data_cache_path(cache_dir: str, *params: int) -> str:
+    """Return the cache file path for a set of generate_dummy_data arguments."""
+    key = json.dumps([_GENERATOR_VERSION, *params]).encode()
+    digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"dummy_data_{digest}.json")
+
+def _generate_locations(
+    num_depots: int,
+    num_parkings: int,
+    rng: np.random.Generator
+) -> Dict[str, Dict[str, Any]]:
     """Generate depot and parking locations with capacities."""
     locations = {}
     
+    # Draw all depot attributes at once
+    depot_capacities = rng.integers(10, 16, size=num_depots).tolist()
+    depot_manhours = rng.integers(40, 101, size=num_depots).tolist()
+    
     # Generate depots
-    for i in range(num_depots):
-        depot_id = f"depot_{i+1}"
+    depot_ids = [f"depot_{i}" for i in range(1, num_depots + 1)]
+    for i, depot_id in enumerate(depot_ids):
         locations[depot_id] = {
             "type": "depot",
-            "capacity": random.randint(10, 15),
-            "manhours_per_shift": random.randint(40, 100),
+            "capacity": depot_capacities[i],
+            "manhours_per_shift": depot_manhours[i],
             "specialized_maintenance": []
         }
     
     # Assign some specialized maintenance capabilities to depots
-    maintenance_specializations = [
+    maintenance_specializations = np.array([
         "electrical", "mechanical", "hydraulic", "pneumatic", "structural"
-    ]
+    ])
+    
+    # Each depot can handle 1-3 specialized maintenance types. Sorting one row
+    # of random keys per depot yields a random permutation of the
+    # specializations for every depot in a single call; each depot then takes
+    # the first num_specializations entries of its row.
+    num_specializations = rng.integers(1, 4, size=num_depots).tolist()
+    permutations = np.argsort(rng.random((num_depots, len(maintenance_specializations))), axis=1)
+    depot_specializations = maintenance_specializations[permutations].tolist()
     
-    for depot in locations.values():
-        if depot["type"] == "depot":
-            # Each depot can handle 1-3 specialized maintenance types
-            num_specializations = random.randint(1, 3)
-            depot["specialized_maintenance"] = random.sample(
-                maintenance_specializations, num_specializations
-            )
+    for i, depot_id in enumerate(depot_ids):
+        locations[depot_id]["specialized_maintenance"] = depot_specializations[i][:num_specializations[i]]
     
     # Generate parkings
-    for i in range(num_parkings):
-        parking_id = f"parking_{i+1}"
+    parking_capacities = rng.integers(10, 21, size=num_parkings).tolist()
+    parking_ids = [f"parking_{i}" for i in range(1, num_parkings + 1)]
+    for i, parking_id in enumerate(parking_ids):
         locations[parking_id] = {
             "type": "parking",
-            "capacity": random.randint(10, 20),
+            "capacity": parking_capacities[i],
         }
     
     return locations
 
-def _generate_maintenance_types(locations: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Generate preventive and corrective maintenance types."""
-    maintenance_types = []
+def _generate_maintenance_types(
+    locations: Dict[str, Dict[str, Any]],
+    rng: np.random.Generator
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Generate preventive and corrective maintenance types.
     
+    Returns:
+        Tuple of (preventive_types, corrective_types)
+    """
     # Get all specializations from depots
     all_specializations = set()
     for loc in locations.values():
         if loc["type"] == "depot":
             all_specializations.update(loc["specialized_maintenance"])
     
-    all_specializations = list(all_specializations)
+    # Sort so that the draws below do not depend on set iteration order
+    all_specializations = sorted(all_specializations)
+    
+    def pick_specialization(probability: float) -> Optional[str]:
+        if all_specializations and rng.random() < probability:
+            return all_specializations[rng.integers(len(all_specializations))]
+        return None
     
     # Generate preventive maintenance types
+    optimal_kms = rng.integers(5000, 20001, size=5)
+    max_kms = (optimal_kms + rng.integers(1000, 3001, size=5)).tolist()
+    optimal_kms = optimal_kms.tolist()
+    preventive_manhours = rng.integers(4, 25, size=5).tolist()
     preventive_types = [
         {
             "id": f"preventive_{i+1}",
             "type": "preventive",
-            "optimal_km": random.randint(5000, 20000),
-            "max_km": lambda opt_km: opt_km + random.randint(1000, 3000),
-            "manhours": random.randint(4, 24),
-            "specialization": random.choice(all_specializations) if all_specializations and random.random() < 0.7 else None
+            "optimal_km": optimal_kms[i],
+            "max_km": max_kms[i],
+            "manhours": preventive_manhours[i],
+            "specialization": pick_specialization(0.7)
         }
         for i in range(5)  # 5 preventive maintenance types
     ]
     
-    # Fix the max_km values
-    for maint in preventive_types:
-        maint["max_km"] = maint["max_km"](maint["optimal_km"])
-    
     # Generate corrective maintenance types
+    max_km_windows = rng.integers(300, 1001, size=5).tolist()
+    corrective_manhours = rng.integers(2, 17, size=5).tolist()
+    safety_critical = (rng.random(size=5) < 0.3).tolist()  # 30% chance of being safety-critical
     corrective_types = [
         {
             "id": f"corrective_{i+1}",
             "type": "corrective",
-            "max_km_window": random.randint(300, 1000),
-            "manhours": random.randint(2, 16),
-            "specialization": random.choice(all_specializations) if all_specializations and random.random() < 0.5 else None,
-            "safety_critical": random.random() < 0.3  # 30% chance of being safety-critical
+            "max_km_window": max_km_windows[i],
+            "manhours": corrective_manhours[i],
+            "specialization": pick_specialization(0.5),
+            "safety_critical": safety_critical[i]
         }
         for i in range(5)  # 5 corrective maintenance types
     ]
     
-    maintenance_types = preventive_types + corrective_types
-    return maintenance_types
+    return preventive_types, corrective_types
 
 def _generate_vehicles(
     num_vehicles: int, 
     locations: Dict[str, Dict[str, Any]], 
-    maintenance_types: List[Dict[str, Any]]
+    preventive_types: List[Dict[str, Any]],
+    corrective_types: List[Dict[str, Any]],
+    rng: np.random.Generator
 ) -> List[Dict[str, Any]]:
     """Generate vehicles with initial state."""
-    vehicles = []
-    
-    # Get all location IDs
-    location_ids = list(locations.keys())
+    # The fleet size is known up front, so the list is allocated once
+    vehicles: List[Optional[Dict[str, Any]]] = [None] * num_vehicles
     
     # Get depot IDs only
     depot_ids = [loc_id for loc_id, loc_data in locations.items() if loc_data["type"] == "depot"]
     
-    # Get corrective maintenance types
-    corrective_types = [m for m in maintenance_types if m["type"] == "corrective"]
-    
-    # Get preventive maintenance types
-    preventive_types = [m for m in maintenance_types if m["type"] == "preventive"]
-    
-    for i in range(num_vehicles):
-        # Random initial location (only from depots)
-        initial_location = random.choice(depot_ids)
-        
-        # Random initial km (between 0 and 25000)
-        initial_km = random.randint(0, 25000)
-        
-        # Generate pending corrective tasks (0-2 per vehicle)
-        pending_corrective_tasks = []
-        num_pending_corrective_tasks = random.randint(0, 2)
-        
-        for _ in range(num_pending_corrective_tasks):
-            corrective_type = random.choice(corrective_types)
-            
-            # Calculate remaining km window
-            remaining_km = random.randint(50, corrective_type["max_km_window"])
-            
-            pending_corrective_tasks.append({
-                "maintenance_type_id": corrective_type["id"],
-                "remaining_km": remaining_km
-            })
-        
-        # Generate pending preventive tasks (around 2 per vehicle)
-        pending_preventive_tasks = []
-        num_pending_preventive_tasks = random.randint(1, 3)  # 1-3 tasks, average of 2
-        
-        for _ in range(num_pending_preventive_tasks):
-            preventive_type = random.choice(preventive_types)
-            
-            # Calculate remaining km until optimal maintenance
-            # This is the distance from current km to optimal_km
-            remaining_km = max(0, preventive_type["optimal_km"] - initial_km)
-            
-            # If already past optimal_km, set a small remaining km to force maintenance soon
-            if remaining_km == 0:
-                remaining_km = random.randint(50, 500)
-            
-            pending_preventive_tasks.append({
-                "maintenance_type_id": preventive_type["id"],
-                "remaining_km": remaining_km
-            })
-        
+    # Draw the per-vehicle attributes for the whole fleet at once:
+    # initial location (only from depots), initial km (between 0 and 25000),
+    # 0-2 pending corrective tasks and 1-3 pending preventive tasks (average of 2)
+    initial_locations = rng.choice(depot_ids, size=num_vehicles).tolist()
+    initial_kms = rng.integers(0, 25001, size=num_vehicles)
+    num_pending_corrective = rng.integers(0, 3, size=num_vehicles)
+    num_pending_preventive = rng.integers(1, 4, size=num_vehicles)
+    
+    # Corrective tasks: the remaining km is drawn within the type's km window
+    corrective_offsets, corrective_type_indices = _draw_task_types(
+        rng, num_pending_corrective, len(corrective_types)
+    )
+    corrective_windows = np.array([m["max_km_window"] for m in corrective_types])
+    corrective_remaining_kms = rng.integers(50, corrective_windows[corrective_type_indices] + 1)
+    
+    # Preventive tasks: the remaining km is the distance from the current km to
+    # optimal_km; if already past optimal_km, set a small remaining km to force
+    # maintenance soon
+    preventive_offsets, preventive_type_indices = _draw_task_types(
+        rng, num_pending_preventive, len(preventive_types)
+    )
+    optimal_kms = np.array([m["optimal_km"] for m in preventive_types])
+    preventive_remaining_kms = np.maximum(
+        0, optimal_kms[preventive_type_indices] - np.repeat(initial_kms, num_pending_preventive)
+    )
+    overdue = preventive_remaining_kms == 0
+    preventive_remaining_kms[overdue] = rng.integers(50, 501, size=int(overdue.sum()))
+    
+    corrective_tasks = _tasks_as_records(corrective_types, corrective_type_indices, corrective_remaining_kms)
+    preventive_tasks = _tasks_as_records(preventive_types, preventive_type_indices, preventive_remaining_kms)
+    corrective_offsets = corrective_offsets.tolist()
+    preventive_offsets = preventive_offsets.tolist()
+    initial_kms = initial_kms.tolist()
+    vehicle_ids = [f"vehicle_{i}" for i in range(1, num_vehicles + 1)]
+    
+    for i, vehicle_id in enumerate(vehicle_ids):
         vehicle = {
-            "id": f"vehicle_{i+1}",
-            "initial_location": initial_location,
-            "initial_km": initial_km,
-            "pending_corrective_tasks": pending_corrective_tasks,
-            "pending_preventive_tasks": pending_preventive_tasks
+            "id": vehicle_id,
+            "initial_location": initial_locations[i],
+            "initial_km": initial_kms[i],
+            "pending_corrective_tasks": corrective_tasks[corrective_offsets[i]:corrective_offsets[i + 1]],
+            "pending_preventive_tasks": preventive_tasks[preventive_offsets[i]:preventive_offsets[i + 1]]
         }
         
-        vehicles.append(vehicle)
+        vehicles[i] = vehicle
     
     return vehicles
 
+def _draw_task_types(
+    rng: np.random.Generator,
+    task_counts: np.ndarray,
+    num_types: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw the maintenance type of every pending task in the fleet.
+    
+    Returns:
+        Tuple of (offsets, type_indices) where the tasks of vehicle i are
+        type_indices[offsets[i]:offsets[i + 1]]
+    """
+    offsets = np.zeros(len(task_counts) + 1, dtype=np.int64)
+    np.cumsum(task_counts, out=offsets[1:])
+    type_indices = rng.integers(0, num_types, size=int(offsets[-1]))
+    return offsets, type_indices
+
+def _tasks_as_records(
+    task_types: List[Dict[str, Any]],
+    type_indices: np.ndarray,
+    remaining_kms: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Convert flat task arrays into pending task dictionaries."""
+    type_ids = np.array([task_type["id"] for task_type in task_types])[type_indices].tolist()
+    return [
+        {"maintenance_type_id": type_id, "remaining_km": remaining_km}
+        for type_id, remaining_km in zip(type_ids, remaining_kms.tolist())
+    ]
+
 def _generate_routes(
     num_routes_per_day: int, 
     planning_days: int, 
-    locations: Dict[str, Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    """Generate routes for each day in the planning horizon."""
-    routes = []
-    
-    # Get all location IDs
-    location_ids = list(locations.keys())
-    
+    locations: Dict[str, Dict[str, Any]],
+    rng: np.random.Generator
+) -> Iterator[Dict[str, Any]]:
+    """Generate routes for each day in the planning horizon, one at a time."""
+    columns = _generate_route_columns(num_routes_per_day, planning_days, locations, rng)
+    return _iter_route_records(columns)
+
+def _generate_route_columns(
+    num_routes_per_day: int, 
+    planning_days: int, 
+    locations: Dict[str, Dict[str, Any]],
+    rng: np.random.Generator
+) -> Dict[str, np.ndarray]:
+    """Generate routes as a struct of arrays with one array per route field."""
     # Get depot IDs only
-    depot_ids = [loc_id for loc_id, loc_data in locations.items() if loc_data["type"] == "depot"]
+    depot_ids = np.array([loc_id for loc_id, loc_data in locations.items() if loc_data["type"] == "depot"])
     
     # Ensure we have at least 2 depots for routes
     if len(depot_ids) < 2:
         raise ValueError("Need at least 2 depots to generate routes")
     
-    for day in range(planning_days):
-        for route_num in range(num_routes_per_day):
-            # Random start and end locations (only from depots)
-            start_location = random.choice(depot_ids)
-            
-            # Ensure end location is different from start location
-            end_location = random.choice([d for d in depot_ids if d != start_location])
-            
-            # Random route distance (50-300 km)
-            distance_km = random.randint(50, 300)
-            
-            route = {
-                "id": f"route_day{day+1}_{route_num+1}",
-                "day": day + 1,
-                "shift": "day",  # All routes are for day shift
-                "start_location": start_location,
-                "end_location": end_location,
-                "distance_km": distance_km
-            }
-            
-            routes.append(route)
+    # Day and per-day route number of every route, in day-major order
+    days = np.repeat(np.arange(1, planning_days + 1), num_routes_per_day)
+    route_nums = np.tile(np.arange(1, num_routes_per_day + 1), planning_days)
+    ids = np.char.add(
+        np.char.add(np.char.add("route_day", days.astype(str)), "_"),
+        route_nums.astype(str)
+    )
+    
+    # Draw start depots, end depots and distances for all routes at once.
+    # Adding a non-zero offset modulo the number of depots guarantees that the
+    # end location differs from the start location without rejection sampling.
+    num_routes = len(days)
+    num_depots = len(depot_ids)
+    start_indices = rng.integers(0, num_depots, size=num_routes)
+    end_indices = (start_indices + rng.integers(1, num_depots, size=num_routes)) % num_depots
     
-    return routes
+    return {
+        "id": ids,
+        "day": days,
+        "shift": np.full(num_routes, "day"),  # All routes are for day shift
+        "start_location": depot_ids[start_indices],
+        "end_location": depot_ids[end_indices],
+        "distance_km": rng.integers(50, 301, size=num_routes)  # Random route distance (50-300 km)
+    }
+
+def _iter_route_records(columns: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """Convert route columns into the route dictionaries used downstream."""
+    rows = zip(*(columns[key].tolist() for key in _ROUTE_KEYS))
+    return (
+        {
+            "id": route_id,
+            "day": day,
+            "shift": shift,
+            "start_location": start_location,
+            "end_location": end_location,
+            "distance_km": distance_km
+        }
+        for route_id, day, shift, start_location, end_location, distance_km in rows
+    )
 
 def _validate_data(
     vehicles: List[Dict[str, Any]],
     locations: Dict[str, Dict[str, Any]],
     maintenance_types: List[Dict[str, Any]],
-    routes: List[Dict[str, Any]]
+    routes: Iterable[Dict[str, Any]]
 ) -> None:
     """Validate the generated data for consistency."""
-    # Check that all vehicle initial locations exist
-    location_ids = set(locations.keys())
+    location_ids = frozenset(locations)
+    maintenance_type_ids = frozenset(m["id"] for m in maintenance_types)
+    
+    # All specializations offered by at least one depot
+    depot_specializations = set().union(*(
+        loc_data.get("specialized_maintenance", [])
+        for loc_data in locations.values() if loc_data["type"] == "depot"
+    ))
+    
+    # Field getters are bound once; each returns a tuple in a single C call
+    get_vehicle_fields = itemgetter("id", "initial_location", "pending_corrective_tasks")
+    get_task_type = itemgetter("maintenance_type_id")
+    # Check that all vehicle initial locations exist and that all pending
+    # maintenance tasks reference valid maintenance types
     for vehicle in vehicles:
-        if vehicle["initial_location"] not in location_ids:
-            raise ValueError(f"Vehicle {vehicle['id']} has invalid initial location: {vehicle['initial_location']}")
+        vehicle_id, initial_location, pending_corrective_tasks = get_vehicle_fields(vehicle)
+        if initial_location not in location_ids:
+            raise ValueError(f"Vehicle {vehicle_id} has invalid initial location: {initial_location}")
+        for task in pending_corrective_tasks:
+            task_type = get_task_type(task)
+            if task_type not in maintenance_type_ids:
+                raise ValueError(f"Vehicle {vehicle_id} has invalid maintenance type: {task_type}")
     
     # Check that all route start/end locations exist
-    for route in routes:
-        if route["start_location"] not in location_ids:
-            raise ValueError(f"Route {route['id']} has invalid start location: {route['start_location']}")
-        if route["end_location"] not in location_ids:
-            raise ValueError(f"Route {route['id']} has invalid end location: {route['end_location']}")
-    
-    # Check that all pending maintenance tasks reference valid maintenance types
-    maintenance_type_ids = {m["id"] for m in maintenance_types}
-    for vehicle in vehicles:
-        for task in vehicle["pending_corrective_tasks"]:
-            if task["maintenance_type_id"] not in maintenance_type_ids:
-                raise ValueError(f"Vehicle {vehicle['id']} has invalid maintenance type: {task['maintenance_type_id']}")
+    for _ in _validated_routes(routes, location_ids):
+        pass
     
     # Check that specialized maintenance types have at least one capable depot
     for maint_type in maintenance_types:
-        if maint_type.get("specialization"):
-            capable_depots = [
-                depot_id for depot_id, depot in locations.items()
-                if depot["type"] == "depot" and maint_type["specialization"] in depot.get("specialized_maintenance", [])
-            ]
-            if not capable_depots:
-                raise ValueError(f"Maintenance type {maint_type['id']} with specialization {maint_type['specialization']} has no capable depots")
+        if maint_type.get("specialization") and maint_type["specialization"] not in depot_specializations:
+            raise ValueError(f"Maintenance type {maint_type['id']} with specialization {maint_type['specialization']} has no capable depots")
+
+def _validated_routes(
+    routes: Iterable[Dict[str, Any]],
+    location_ids: FrozenSet[str]
+) -> Iterator[Dict[str, Any]]:
+    """Yield routes after checking that their start/end locations exist."""
+    get_route_fields = itemgetter("id", "start_location", "end_location")
+    for route in routes:
+        route_id, start_location, end_location = get_route_fields(route)
+        if start_location not in location_ids:
+            raise ValueError(f"Route {route_id} has invalid start location: {start_location}")
+        if end_location not in location_ids:
+            raise ValueError(f"Route {route_id} has invalid end location: {end_location}")
+        yield route
 
 def save_dummy_data(data: Dict[str, Any], filepath: str) -> None:
     """Save the generated dummy data to a JSON file."""
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+    dump_json(data, filepath)
 
 def load_dummy_data(filepath: str) -> Dict[str, Any]:
     """Load dummy data from a JSON file."""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    return load_json(filepath)
 
 def generate_data_summary(data: Dict[str, Any], output_dir: str = "output") -> None:
     """
@@ -317,80 +465,91 @@ def generate_data_summary(data: Dict[str, Any], output_dir: str = "output") -> N
     maintenance_types = data["maintenance_types"]
     routes = data["routes"]
     
-    # Create a summary structure
-    summary = {
-        "vehicles": {},
-        "locations": {},
-        "maintenance_types": {},
-        "routes": {},
-        "statistics": {
-            "total_vehicles": len(vehicles),
-            "total_depots": sum(1 for loc in locations.values() if loc["type"] == "depot"),
-            "total_parkings": sum(1 for loc in locations.values() if loc["type"] == "parking"),
-            "total_routes": len(routes),
-            "total_maintenance_types": len(maintenance_types),
-            "preventive_maintenance_types": sum(1 for mt in maintenance_types if mt["type"] == "preventive"),
-            "corrective_maintenance_types": sum(1 for mt in maintenance_types if mt["type"] == "corrective"),
-            "total_pending_corrective_tasks": sum(len(v.get("pending_corrective_tasks", [])) for v in vehicles),
-            "total_pending_preventive_tasks": sum(len(v.get("pending_preventive_tasks", [])) for v in vehicles)
-        }
+    # The statistics are accumulated while the sections below are streamed, so
+    # each input list is walked only once; they are written last
+    statistics = {
+        "total_vehicles": len(vehicles),
+        "total_depots": 0,
+        "total_parkings": 0,
+        "total_routes": 0,
+        "total_maintenance_types": len(maintenance_types),
+        "preventive_maintenance_types": 0,
+        "corrective_maintenance_types": 0,
+        "total_pending_corrective_tasks": 0,
+        "total_pending_preventive_tasks": 0
     }
     
-    # Add vehicle summaries
-    for vehicle in vehicles:
-        vehicle_id = vehicle["id"]
-        summary["vehicles"][vehicle_id] = {
-            "initial_state": {
-                "location": vehicle["initial_location"],
-                "km": vehicle["initial_km"]
-            },
-            "pending_corrective_tasks": vehicle.get("pending_corrective_tasks", []),
-            "pending_preventive_tasks": vehicle.get("pending_preventive_tasks", [])
-        }
-    
-    # Add location summaries
-    for loc_id, loc_data in locations.items():
-        summary["locations"][loc_id] = {
-            "type": loc_data["type"],
-            "capacity": loc_data["capacity"]
-        }
-        if loc_data["type"] == "depot":
-            summary["locations"][loc_id]["manhours_per_shift"] = loc_data["manhours_per_shift"]
-            summary["locations"][loc_id]["specialized_maintenance"] = loc_data.get("specialized_maintenance", [])
-    
-    # Add maintenance type summaries
-    for maint_type in maintenance_types:
-        maint_id = maint_type["id"]
-        summary["maintenance_types"][maint_id] = {
-            "type": maint_type["type"],
-            "manhours": maint_type["manhours"]
-        }
-        if maint_type["type"] == "preventive":
-            summary["maintenance_types"][maint_id]["optimal_km"] = maint_type["optimal_km"]
-            summary["maintenance_types"][maint_id]["max_km"] = maint_type["max_km"]
-        elif maint_type["type"] == "corrective":
-            summary["maintenance_types"][maint_id]["max_km_window"] = maint_type["max_km_window"]
-        
-        if "specialization" in maint_type and maint_type["specialization"] is not None:
-            summary["maintenance_types"][maint_id]["specialization"] = maint_type["specialization"]
+    def vehicle_summaries():
+        for vehicle in vehicles:
+            pending_corrective_tasks = vehicle.get("pending_corrective_tasks", [])
+            pending_preventive_tasks = vehicle.get("pending_preventive_tasks", [])
+            statistics["total_pending_corrective_tasks"] += len(pending_corrective_tasks)
+            statistics["total_pending_preventive_tasks"] += len(pending_preventive_tasks)
+            yield vehicle["id"], {
+                "initial_state": {
+                    "location": vehicle["initial_location"],
+                    "km": vehicle["initial_km"]
+                },
+                "pending_corrective_tasks": pending_corrective_tasks,
+                "pending_preventive_tasks": pending_preventive_tasks
+            }
     
-    # Add route summaries
-    for route in routes:
-        route_id = route["id"]
-        summary["routes"][route_id] = {
-            "day": route["day"],
-            "shift": route["shift"],
-            "start_location": route["start_location"],
-            "end_location": route["end_location"],
-            "distance_km": route["distance_km"]
-        }
+    def location_summaries():
+        for loc_id, loc_data in locations.items():
+            loc_type = loc_data["type"]
+            loc_summary = {
+                "type": loc_type,
+                "capacity": loc_data["capacity"]
+            }
+            if loc_type == "depot":
+                statistics["total_depots"] += 1
+                loc_summary["manhours_per_shift"] = loc_data["manhours_per_shift"]
+                loc_summary["specialized_maintenance"] = loc_data.get("specialized_maintenance", [])
+            elif loc_type == "parking":
+                statistics["total_parkings"] += 1
+            yield loc_id, loc_summary
+    
+    def maintenance_type_summaries():
+        for maint_type in maintenance_types:
+            maint_kind = maint_type["type"]
+            maint_summary = {
+                "type": maint_kind,
+                "manhours": maint_type["manhours"]
+            }
+            if maint_kind == "preventive":
+                statistics["preventive_maintenance_types"] += 1
+                maint_summary["optimal_km"] = maint_type["optimal_km"]
+                maint_summary["max_km"] = maint_type["max_km"]
+            elif maint_kind == "corrective":
+                statistics["corrective_maintenance_types"] += 1
+                maint_summary["max_km_window"] = maint_type["max_km_window"]
+            
+            if maint_type.get("specialization") is not None:
+                maint_summary["specialization"] = maint_type["specialization"]
+            yield maint_type["id"], maint_summary
+    
+    def route_summaries():
+        for route in routes:
+            statistics["total_routes"] += 1
+            yield route["id"], {
+                "day": route["day"],
+                "shift": route["shift"],
+                "start_location": route["start_location"],
+                "end_location": route["end_location"],
+                "distance_km": route["distance_km"]
+            }
     
     # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    _ensure_dir(output_dir)
     
-    # Save the summary to a JSON file
+    # Stream the summary to a JSON file
     summary_filepath = os.path.join(output_dir, "data_summary.json")
-    with open(summary_filepath, 'w') as f:
-        json.dump(summary, f, indent=2)
+    dump_json_sections([
+        ("vehicles", vehicle_summaries()),
+        ("locations", location_summaries()),
+        ("maintenance_types", maintenance_type_summaries()),
+        ("routes", route_summaries()),
+        ("statistics", statistics.items())
+    ], summary_filepath)
     
     print(f"Data summary saved to: {summary_filepath}")
@@ -3,16 +3,30 @@ Optimizer module for the Rail Operations & Maintenance Optimizer.
 
 This module implements the constraint programming model using Google OR-Tools.
 """
+import os
 from typing import Dict, List, Any, Tuple, Optional
+import numpy as np
 from ortools.sat.python import cp_model
 
-def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60) -> Dict[str, Any]:
+from .serialization import dump_json
+
+def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60,
+                            debug_names: bool = False, num_workers: Optional[int] = None,
+                            log_search_progress: bool = False,
+                            sat_parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Solve the rail operations and maintenance optimization problem.
     
     Args:
         data: Dictionary containing the input data (vehicles, locations, maintenance_types, routes)
         time_limit_seconds: Time limit for the solver in seconds
+        debug_names: Whether to give the model variables descriptive names. CP-SAT only uses
+            names for debugging (e.g. when exporting the model), so they are left empty by default
+            to avoid formatting a string for every variable
+        num_workers: Number of parallel CP-SAT search workers. Defaults to one per CPU core
+        log_search_progress: Whether CP-SAT should log its search progress to stdout
+        sat_parameters: Optional CP-SAT parameters to set on the solver, as a dictionary
+            mapping SatParameters field names to values (e.g. {"symmetry_level": 2})
         
     Returns:
         Dictionary containing the optimization results
@@ -39,13 +53,18 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         for shift in shifts:
             all_shifts.append((day, shift))
     
-    # Get routes by day and shift
-    routes_by_day_shift = {}
-    for day, shift in all_shifts:
-        routes_by_day_shift[(day, shift)] = [
-            route for route in routes 
-            if route["day"] == day and route["shift"] == shift
-        ]
+    # Number the shifts including the initial state: index 0 is the initial state and
+    # shift k of day d has index (d - 1) * len(shifts) + k + 1
+    num_shifts = len(all_shifts) + 1
+    
+    # Precompute the day and shift name of each shift index for direct lookup
+    shift_days = [0] + [day for day, shift in all_shifts]
+    shift_names = ["initial"] + [shift for day, shift in all_shifts]
+    
+    # Get routes by shift index
+    routes_by_shift_idx = [[] for _ in range(num_shifts)]
+    for route in routes:
+        routes_by_shift_idx[(route["day"] - 1) * len(shifts) + shifts.index(route["shift"]) + 1].append(route)
     
     # Create variables
     
@@ -55,7 +74,7 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         vehicle_id = vehicle["id"]
         for route in routes:
             route_id = route["id"]
-            var_name = f"assign_{vehicle_id}_{route_id}"
+            var_name = f"assign_{vehicle_id}_{route_id}" if debug_names else ""
             assign_vr[(vehicle_id, route_id)] = model.NewBoolVar(var_name)
     
     # 2. Location variables: loc_start_vs[v, s] = location of vehicle v at the start of shift s
@@ -66,35 +85,28 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
     # Create a reverse mapping from indices to location IDs
     index_to_location_id = {idx: loc_id for loc_id, idx in location_id_to_index.items()}
     
-    # Create all shifts including the initial state (0)
-    all_shifts_with_initial = [(0, "initial")] + all_shifts
-    
-    # Create a mapping from shift to index for easy lookup
-    shift_to_index = {shift: idx for idx, shift in enumerate(all_shifts_with_initial)}
-    
     # Create location variables
     loc_start_vs = {}
     for vehicle in vehicles:
         vehicle_id = vehicle["id"]
-        for idx, (day, shift) in enumerate(all_shifts_with_initial):
-            var_name = f"loc_start_{vehicle_id}_{day}_{shift}"
+        for idx in range(num_shifts):
+            var_name = f"loc_start_{vehicle_id}_{shift_days[idx]}_{shift_names[idx]}" if debug_names else ""
             # Location variable domain: 0 to len(locations)-1
             loc_start_vs[(vehicle_id, idx)] = model.NewIntVar(0, len(locations) - 1, var_name)
     
     # 3. KM tracking variables: km_at_shift_start[v, s] = accumulated km of vehicle v at the start of shift s
-    # Define the maximum possible km (sum of all route distances + initial km)
-    max_initial_km = max(vehicle["initial_km"] for vehicle in vehicles)
+    # Define the maximum possible km of each vehicle (its initial km + sum of all route distances)
     max_route_km = sum(route["distance_km"] for route in routes)
-    max_possible_km = max_initial_km + max_route_km
+    max_possible_km = {vehicle["id"]: vehicle["initial_km"] + max_route_km for vehicle in vehicles}
     
     # Create KM variables
     km_at_shift_start = {}
     for vehicle in vehicles:
         vehicle_id = vehicle["id"]
-        for idx, (day, shift) in enumerate(all_shifts_with_initial):
-            var_name = f"km_at_shift_start_{vehicle_id}_{day}_{shift}"
-            # KM variable domain: 0 to max_possible_km
-            km_at_shift_start[(vehicle_id, idx)] = model.NewIntVar(0, max_possible_km, var_name)
+        for idx in range(num_shifts):
+            var_name = f"km_at_shift_start_{vehicle_id}_{shift_days[idx]}_{shift_names[idx]}" if debug_names else ""
+            # KM variable domain: 0 to the vehicle's max possible km
+            km_at_shift_start[(vehicle_id, idx)] = model.NewIntVar(0, max_possible_km[vehicle_id], var_name)
     
     # 4. Maintenance variables
     # Create a list of all potential maintenance instances
@@ -102,33 +114,79 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
     
     # Track maintenance variables in dictionaries for easy access
     maint_performed = {}  # Boolean: 1 if maintenance is performed, 0 otherwise
-    maint_start_s = {}    # Integer: shift index when maintenance starts
     maint_assigned_depot = {}  # Integer: depot index where maintenance is performed
     km_at_maint_start = {}  # Integer: vehicle km at the start of maintenance
     maint_intervals = {}  # OptionalIntervalVar: represents the maintenance interval
-    maint_active_s = {}  # Boolean: 1 if maintenance is active during shift s
+    maint_active_s = {}  # Literal: 1 if maintenance is active during shift s (aliases maint_performed)
     
     # Get depot locations (for maintenance assignment)
     depot_locations = [loc_id for loc_id, loc_data in locations.items() if loc_data["type"] == "depot"]
     depot_indices = [location_id_to_index[loc_id] for loc_id in depot_locations]
     
+    # Map each maintenance specialization to the indices of the depots that can handle it
+    # If no capable depots are found, any depot can be used (fallback)
+    specialization_depot_indices = {}
+    for maint_type in maintenance_types:
+        specialization = maint_type.get("specialization", None)
+        if specialization and specialization not in specialization_depot_indices:
+            capable_depot_indices = [
+                location_id_to_index[loc_id] for loc_id in depot_locations
+                if specialization in locations[loc_id].get("specialized_maintenance", [])
+            ]
+            specialization_depot_indices[specialization] = capable_depot_indices or depot_indices
+    
     # Maximum maintenance duration in shifts (for interval variables)
     max_maint_duration = 5  # Assuming no maintenance takes more than 5 shifts
     
+    # Estimate the duration of each maintenance type based on required manhours (simplified for now)
+    # In a real implementation, this would depend on depot manhours per shift
+    maint_manhours = np.array([mt["manhours"] for mt in maintenance_types], dtype=np.int64)
+    maint_est_durations = np.clip(maint_manhours // 8, 1, max_maint_duration)  # Rough estimate: 8 hours per shift
+    
+    # Determine which (vehicle, maintenance type) pairs can ever be performed:
+    # - maintenance for one of the vehicle's pending tasks
+    # - preventive maintenance without a pending task, as long as the vehicle's initial km
+    #   (a lower bound on its km at any start shift) doesn't already exceed max_km
+    # Corrective maintenance is only scheduled for the vehicle's pending corrective tasks
+    maint_type_index = {mt["id"]: m_idx for m_idx, mt in enumerate(maintenance_types)}
+    has_pending_task = np.zeros((len(vehicles), len(maintenance_types)), dtype=bool)
+    for v_idx, vehicle in enumerate(vehicles):
+        for pending_task in vehicle.get("pending_preventive_tasks", []) + vehicle.get("pending_corrective_tasks", []):
+            if pending_task["maintenance_type_id"] in maint_type_index:
+                has_pending_task[v_idx, maint_type_index[pending_task["maintenance_type_id"]]] = True
+    
+    vehicle_initial_km = np.array([vehicle["initial_km"] for vehicle in vehicles], dtype=np.float64)
+    maint_max_km = np.array([mt["max_km"] if mt["type"] == "preventive" else -np.inf
+                             for mt in maintenance_types], dtype=np.float64)
+    schedulable = has_pending_task | (vehicle_initial_km[:, None] <= maint_max_km[None, :])
+    
     # For each vehicle and maintenance type, create potential maintenance instances
-    for vehicle in vehicles:
+    for v_idx, vehicle in enumerate(vehicles):
         vehicle_id = vehicle["id"]
         
+        # Look up the vehicle's pending tasks by maintenance type (the first task of a type wins)
+        pending_preventive_by_type = {}
+        for pending_task in vehicle.get("pending_preventive_tasks", []):
+            pending_preventive_by_type.setdefault(pending_task["maintenance_type_id"], pending_task)
+        pending_corrective_by_type = {}
+        for pending_task in vehicle.get("pending_corrective_tasks", []):
+            pending_corrective_by_type.setdefault(pending_task["maintenance_type_id"], pending_task)
+        
         # For each maintenance type
-        for maint_type in maintenance_types:
+        for m_idx, maint_type in enumerate(maintenance_types):
+            # Skip maintenance types that can never be performed for this vehicle
+            if not schedulable[v_idx, m_idx]:
+                continue
+            
             maint_id = maint_type["id"]
             maint_type_id = maint_type["type"]  # 'preventive' or 'corrective'
             required_manhours = maint_type["manhours"]  # Field is called 'manhours' in the data generator
+            est_duration = int(maint_est_durations[m_idx])
             
             # For each potential start shift (excluding the initial state)
-            for start_idx, (start_day, start_shift) in enumerate(all_shifts_with_initial[1:], 1):
+            for start_idx in range(1, num_shifts):
                 # Create a unique ID for this maintenance instance
-                instance_id = f"{vehicle_id}_{maint_id}_{start_day}_{start_shift}"
+                instance_id = f"{vehicle_id}_{maint_id}_{shift_days[start_idx]}_{shift_names[start_idx]}"
                 
                 # Add to the list of all maintenance instances
                 all_maint_instances.append({
@@ -138,51 +196,32 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                     "maint_type": maint_type_id,
                     "start_idx": start_idx,
                     "required_manhours": required_manhours,
+                    "est_duration": est_duration,
                     "specialization": maint_type.get("specialization", None)
                 })
                 
                 # 1. maint_performed: Boolean variable indicating if this maintenance is performed
-                var_name = f"maint_performed_{instance_id}"
+                var_name = f"maint_performed_{instance_id}" if debug_names else ""
                 maint_performed[instance_id] = model.NewBoolVar(var_name)
                 
-                # 2. maint_start_s: Integer variable for the shift index when maintenance starts
-                # This is fixed to the start_idx for this instance
-                maint_start_s[instance_id] = start_idx
+                # The shift index when maintenance starts is fixed to the instance's start_idx
                 
-                # 3. maint_assigned_depot: Integer variable for the depot where maintenance is performed
-                var_name = f"maint_assigned_depot_{instance_id}"
+                # 2. maint_assigned_depot: Integer variable for the depot where maintenance is performed
+                var_name = f"maint_assigned_depot_{instance_id}" if debug_names else ""
                 
                 # If the maintenance type has a specialization, restrict the domain to capable depots
+                # (otherwise any depot can perform this maintenance)
                 specialization = maint_type.get("specialization", None)
-                if specialization:
-                    # Find depots that can handle this specialization
-                    capable_depot_ids = []
-                    for loc_id, loc_data in locations.items():
-                        if loc_data["type"] == "depot" and specialization in loc_data.get("specialized_maintenance", []):
-                            capable_depot_ids.append(loc_id)
-                    
-                    # Convert capable depot IDs to indices
-                    capable_depot_indices = [location_id_to_index[depot_id] for depot_id in capable_depot_ids]
-                    
-                    # If no capable depots found, use all depots (fallback)
-                    if not capable_depot_indices:
-                        capable_depot_indices = depot_indices
-                    
-                    # Create domain from capable depot indices
-                    maint_assigned_depot[instance_id] = model.NewIntVarFromDomain(
-                        cp_model.Domain.FromValues(capable_depot_indices), var_name)
-                else:
-                    # Any depot can perform this maintenance
-                    maint_assigned_depot[instance_id] = model.NewIntVarFromDomain(
-                        cp_model.Domain.FromValues(depot_indices), var_name)
+                capable_depot_indices = specialization_depot_indices.get(specialization, depot_indices)
+                maint_assigned_depot[instance_id] = model.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues(capable_depot_indices), var_name)
                 
-                # 4. km_at_maint_start: Integer variable for the vehicle's km at the start of maintenance
-                var_name = f"km_at_maint_start_{instance_id}"
-                km_at_maint_start[instance_id] = model.NewIntVar(0, max_possible_km, var_name)
+                # 3. km_at_maint_start: Integer variable for the vehicle's km at the start of maintenance
+                var_name = f"km_at_maint_start_{instance_id}" if debug_names else ""
+                km_at_maint_start[instance_id] = model.NewIntVar(0, max_possible_km[vehicle_id], var_name)
                 
                 # C6: KM Recording - Link km_at_maint_start to the vehicle's km at the start of the shift
-                # Use AddElement to dynamically select the correct km_at_shift_start based on maint_start_s
-                # This is a more flexible approach than directly using start_idx
+                # The start shift is fixed, so the km at the start of that shift is used directly
                 # Only enforce if maintenance is performed
                 model.Add(km_at_maint_start[instance_id] == km_at_shift_start[(vehicle_id, start_idx)])\
                     .OnlyEnforceIf(maint_performed[instance_id])
@@ -194,16 +233,15 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                     optimal_km = maint_type["optimal_km"]
                     
                     # Check if this vehicle has this preventive maintenance type pending
-                    for pending_task in vehicle.get("pending_preventive_tasks", []):
-                        if pending_task["maintenance_type_id"] == maint_id:
-                            # Calculate the max KM based on initial KM and remaining KM window
-                            initial_km = vehicle["initial_km"]
-                            remaining_km = pending_task["remaining_km"]
-                            max_km = initial_km + remaining_km
-                            
-                            # We'll track preventive tasks and ensure at least one instance of each is performed
-                            # This will be handled in a separate constraint after all maintenance instances are created
-                            break
+                    pending_task = pending_preventive_by_type.get(maint_id)
+                    if pending_task is not None:
+                        # Calculate the max KM based on initial KM and remaining KM window
+                        initial_km = vehicle["initial_km"]
+                        remaining_km = pending_task["remaining_km"]
+                        max_km = initial_km + remaining_km
+                        
+                        # We'll track preventive tasks and ensure at least one instance of each is performed
+                        # This will be handled in a separate constraint after all maintenance instances are created
                     
                     # Add constraint: km_at_maint_start <= max_km
                     # Only enforce if maintenance is performed
@@ -211,55 +249,49 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                         .OnlyEnforceIf(maint_performed[instance_id])
                     
                     # Create deviation variable for the objective function
-                    # This linearizes the absolute difference |km_at_maint_start - optimal_km|
-                    var_name = f"deviation_{instance_id}"
-                    deviation_var = model.NewIntVar(0, max_possible_km, var_name)
+                    # This is the absolute difference |km_at_maint_start - optimal_km|,
+                    # which is at most the larger of the vehicle's max possible km and optimal_km
+                    max_deviation = max(max_possible_km[vehicle_id], optimal_km)
+                    var_name = f"deviation_{instance_id}" if debug_names else ""
+                    deviation_var = model.NewIntVar(0, max_deviation, var_name)
                     
-                    # Create helper variables for the linearization
-                    pos_diff_var = model.NewIntVar(0, max_possible_km, f"pos_diff_{instance_id}")
-                    neg_diff_var = model.NewIntVar(0, max_possible_km, f"neg_diff_{instance_id}")
+                    # Create a helper variable for the signed difference
+                    diff_var = model.NewIntVar(-max_deviation, max_deviation, f"diff_{instance_id}" if debug_names else "")
                     
-                    # Add constraints to linearize the absolute difference
-                    # km_at_maint_start - optimal_km = pos_diff - neg_diff
-                    model.Add(km_at_maint_start[instance_id] - optimal_km == pos_diff_var - neg_diff_var)\
+                    # diff = km_at_maint_start - optimal_km if maintenance is performed, 0 otherwise
+                    # (so the deviation of an instance that is not performed is 0)
+                    model.Add(diff_var == km_at_maint_start[instance_id] - optimal_km)\
                         .OnlyEnforceIf(maint_performed[instance_id])
+                    model.Add(diff_var == 0).OnlyEnforceIf(maint_performed[instance_id].Not())
                     
-                    # deviation = pos_diff + neg_diff
-                    model.Add(deviation_var == pos_diff_var + neg_diff_var)\
-                        .OnlyEnforceIf(maint_performed[instance_id])
-                    
-                    # If maintenance is not performed, deviation is 0
-                    model.Add(deviation_var == 0).OnlyEnforceIf(maint_performed[instance_id].Not())
+                    # deviation = |diff|
+                    model.AddAbsEquality(deviation_var, diff_var)
                     
                     # Add to the list of deviation variables for the objective function
                     deviation_vars.append(deviation_var)
                 elif maint_type_id == "corrective":
                     # For corrective maintenance, use the max_km_window from the maintenance type
                     # Check if this vehicle has this corrective maintenance type pending
-                    for pending_task in vehicle.get("pending_corrective_tasks", []):
-                        if pending_task["maintenance_type_id"] == maint_id:
-                            # Calculate the max KM based on initial KM and remaining KM window
-                            initial_km = vehicle["initial_km"]
-                            remaining_km = pending_task["remaining_km"]
-                            max_km = initial_km + remaining_km
-                            
-                            # Add constraint: km_at_maint_start <= max_km
-                            # Only enforce if maintenance is performed
-                            model.Add(km_at_maint_start[instance_id] <= max_km)\
-                                .OnlyEnforceIf(maint_performed[instance_id])
-                            
-                            # C8: Force Corrective Maintenance - Ensure this corrective task is performed
-                            # Instead of forcing all corrective tasks to be performed (which may cause infeasibility),
-                            # we'll track them and ensure at least one instance of each corrective task is performed
-                            # This will be handled in a separate constraint after all maintenance instances are created
-                            break
-                
-                # 5. maint_intervals: OptionalIntervalVar representing the maintenance interval
-                # Estimate duration based on required manhours (simplified for now)
-                # In a real implementation, this would depend on depot manhours per shift
-                est_duration = min(max(1, required_manhours // 8), max_maint_duration)  # Rough estimate: 8 hours per shift
-                
-                var_name = f"maint_interval_{instance_id}"
+                    pending_task = pending_corrective_by_type.get(maint_id)
+                    if pending_task is not None:
+                        # Calculate the max KM based on initial KM and remaining KM window
+                        initial_km = vehicle["initial_km"]
+                        remaining_km = pending_task["remaining_km"]
+                        max_km = initial_km + remaining_km
+                        
+                        # Add constraint: km_at_maint_start <= max_km
+                        # Only enforce if maintenance is performed
+                        model.Add(km_at_maint_start[instance_id] <= max_km)\
+                            .OnlyEnforceIf(maint_performed[instance_id])
+                        
+                        # C8: Force Corrective Maintenance - Ensure this corrective task is performed
+                        # Instead of forcing all corrective tasks to be performed (which may cause infeasibility),
+                        # we'll track them and ensure at least one instance of each corrective task is performed
+                        # This will be handled in a separate constraint after all maintenance instances are created
+                
+                # 4. maint_intervals: OptionalIntervalVar representing the maintenance interval
+                # using the estimated duration of the maintenance type
+                var_name = f"maint_interval_{instance_id}" if debug_names else ""
                 maint_intervals[instance_id] = model.NewOptionalIntervalVar(
                     start=start_idx,  # Start shift index
                     size=est_duration,  # Estimated duration in shifts
@@ -268,26 +300,16 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                     name=var_name
                 )
                 
-                # 6. maint_active_s: Boolean variables indicating if maintenance is active during each shift
-                # For each shift in the potential maintenance interval
-                for s_idx in range(start_idx, min(start_idx + est_duration, len(all_shifts_with_initial))):
-                    var_name = f"maint_active_{instance_id}_{s_idx}"
-                    maint_active_s[(instance_id, s_idx)] = model.NewBoolVar(var_name)
-                    
-                    # Link maint_active_s to the maintenance being performed
-                    # maint_active_s is true if and only if:
-                    # 1. The maintenance is performed (maint_performed is true)
-                    # 2. The shift index is within the maintenance interval
-                    
-                    # If maintenance is performed and shift is within interval, maint_active_s is true
-                    model.AddBoolAnd([maint_performed[instance_id]]).OnlyEnforceIf(maint_active_s[(instance_id, s_idx)])
-                    
-                    # If maintenance is not performed, maint_active_s is false
-                    model.AddImplication(maint_performed[instance_id].Not(), maint_active_s[(instance_id, s_idx)].Not())
+                # 5. maint_active_s: literal indicating if maintenance is active during each shift
+                # The start shift of an instance is fixed, so the maintenance is active during a shift
+                # of its interval exactly when it is performed: reuse maint_performed as the literal
+                # instead of creating an aliasing BoolVar per shift
+                for s_idx in range(start_idx, min(start_idx + est_duration, num_shifts)):
+                    maint_active_s[(instance_id, s_idx)] = maint_performed[instance_id]
                     
                     # C8: Maintenance Location Constraint - Part 2: Location continuity during maintenance
                     # If maintenance is active during this shift, the vehicle must remain at the same location for the next shift
-                    if s_idx + 1 < len(all_shifts_with_initial):
+                    if s_idx + 1 < num_shifts:
                         # Vehicle location at the current shift
                         loc_current = loc_start_vs[(vehicle_id, s_idx)]
                         # Vehicle location at the next shift
@@ -298,8 +320,26 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                 
                 # C8: Maintenance Location Constraint - Part 1: Maintenance must be performed at the assigned depot
                 # If maintenance is performed, the vehicle must be at the assigned depot at the start of maintenance
-                model.Add(loc_start_vs[(vehicle_id, start_idx)] == maint_assigned_depot[instance_id])\
-                    .OnlyEnforceIf(maint_performed[instance_id])
+                # Expressed as a table over (maint_performed, location, assigned depot): when performed the location
+                # equals the depot, otherwise any combination is allowed
+                allowed_assignments = [(1, depot_index, depot_index) for depot_index in capable_depot_indices]
+                allowed_assignments.extend(
+                    (0, location_index, depot_index)
+                    for location_index in range(len(locations))
+                    for depot_index in capable_depot_indices
+                )
+                model.AddAllowedAssignments(
+                    [maint_performed[instance_id], loc_start_vs[(vehicle_id, start_idx)], maint_assigned_depot[instance_id]],
+                    allowed_assignments
+                )
+    
+    # Index maintenance instances by vehicle and by (vehicle, maintenance type) so the constraints
+    # below don't have to scan all instances for every vehicle
+    instances_by_vehicle = {vehicle["id"]: [] for vehicle in vehicles}
+    instances_by_vehicle_type = {}
+    for instance in all_maint_instances:
+        instances_by_vehicle[instance["vehicle_id"]].append(instance)
+        instances_by_vehicle_type.setdefault((instance["vehicle_id"], instance["maint_id"]), []).append(instance)
     
     # Add constraints
     
@@ -308,13 +348,13 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         route_id = route["id"]
         # Get all assignment variables for this route
         route_vars = [assign_vr[(vehicle["id"], route_id)] for vehicle in vehicles]
-        # Add constraint: sum of assignments for this route must be exactly 1
-        model.Add(sum(route_vars) == 1)
+        # Add constraint: exactly one of the assignments for this route must be true
+        model.AddExactlyOne(route_vars)
     
     # C2: Vehicle Uniqueness - Each vehicle can be assigned to at most one route per shift
-    for day, shift in all_shifts:
+    for idx in range(1, num_shifts):
         # Get routes for this shift
-        shift_routes = routes_by_day_shift.get((day, shift), [])
+        shift_routes = routes_by_shift_idx[idx]
         if not shift_routes:
             continue
             
@@ -322,18 +362,18 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
             vehicle_id = vehicle["id"]
             # Get all assignment variables for this vehicle in this shift
             vehicle_shift_vars = [assign_vr[(vehicle_id, route["id"])] for route in shift_routes]
-            # Add constraint: sum of assignments for this vehicle in this shift must be at most 1
+            # Add constraint: at most one of the assignments for this vehicle in this shift can be true
             if vehicle_shift_vars:
-                model.Add(sum(vehicle_shift_vars) <= 1)
+                model.AddAtMostOne(vehicle_shift_vars)
     
     # C12: Full Vehicle Activity Exclusivity - A vehicle cannot be assigned to a route during a shift where it's under maintenance
-    for shift_idx, (day, shift) in enumerate(all_shifts):
+    for active_shift_idx in range(1, num_shifts):
         # Skip night shifts (no routes during night shifts)
-        if shift == "night":
+        if shift_names[active_shift_idx] == "night":
             continue
             
         # Get routes for this shift
-        shift_routes = routes_by_day_shift.get((day, shift), [])
+        shift_routes = routes_by_shift_idx[active_shift_idx]
         if not shift_routes:
             continue
         
@@ -344,21 +384,16 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
             vehicle_route_vars = [assign_vr[(vehicle_id, route["id"])] for route in shift_routes]
             
             # Get all maintenance activity variables for this vehicle in this shift
-            # The shift index in all_shifts is offset by 1 from all_shifts_with_initial (which includes initial state)
-            active_shift_idx = shift_idx + 1  # +1 to account for the initial state
-            
-            for instance in all_maint_instances:
-                if instance["vehicle_id"] == vehicle_id:
-                    instance_id = instance["id"]
+            for instance in instances_by_vehicle[vehicle_id]:
+                instance_id = instance["id"]
+                
+                # Check if this maintenance instance is active in this shift
+                if (instance_id, active_shift_idx) in maint_active_s:
+                    maint_active_var = maint_active_s[(instance_id, active_shift_idx)]
                     
-                    # Check if this maintenance instance is active in this shift
-                    if (instance_id, active_shift_idx) in maint_active_s:
-                        maint_active_var = maint_active_s[(instance_id, active_shift_idx)]
-                        
-                        # For each route, add constraint: if maintenance is active, route cannot be assigned
-                        for route_var in vehicle_route_vars:
-                            # route_var and maint_active_var cannot both be 1
-                            model.AddBoolOr([route_var.Not(), maint_active_var.Not()])
+                    # If maintenance is active, no route can be assigned: together with C2, at most one
+                    # of the route assignments and this maintenance literal can be true
+                    model.AddAtMostOne(vehicle_route_vars + [maint_active_var])
     
     # C3: Initial Location Constraint - Set the initial location for each vehicle
     for vehicle in vehicles:
@@ -370,19 +405,12 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         model.Add(loc_start_vs[(vehicle_id, 0)] == initial_location_index)
     
     # C4: Location Transition Logic - Track vehicle locations across shifts
-    # Create a mapping from (day, shift) to shift index for easier reference
-    shift_to_index = {shift: idx for idx, shift in enumerate(all_shifts_with_initial)}
-    
-    for idx, (day, shift) in enumerate(all_shifts):
-        # Skip the initial state (already handled)
-        if idx == 0 and shift == "initial":
-            continue
-            
-        # Get the current shift index
-        curr_shift_idx = shift_to_index[(day, shift)]
+    # The initial state (shift index 0) is already handled by C3
+    for curr_shift_idx in range(1, num_shifts):
+        day, shift = shift_days[curr_shift_idx], shift_names[curr_shift_idx]
         
         # Get routes for this shift
-        shift_routes = routes_by_day_shift.get((day, shift), [])
+        shift_routes = routes_by_shift_idx[curr_shift_idx]
         
         for vehicle in vehicles:
             vehicle_id = vehicle["id"]
@@ -390,133 +418,103 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
             # Get the previous shift index
             prev_shift_idx = curr_shift_idx - 1
             
-            # For each route in this shift
-            for route in shift_routes:
-                route_id = route["id"]
-                start_location = route["start_location"]
-                end_location = route["end_location"]
-                start_location_index = location_id_to_index[start_location]
-                end_location_index = location_id_to_index[end_location]
-                
-                # Create a literal for this route assignment
-                route_assigned_lit = assign_vr[(vehicle_id, route_id)]
-                
-                # If vehicle is assigned to this route:
-                # 1. Current location must match route start location
-                model.Add(loc_start_vs[(vehicle_id, curr_shift_idx)] == start_location_index).OnlyEnforceIf(route_assigned_lit)
-                
-                # 2. Next location (at the start of next shift) must match route end location
-                if curr_shift_idx + 1 < len(all_shifts_with_initial):
-                    model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == end_location_index).OnlyEnforceIf(route_assigned_lit)
-            
             # Check for maintenance activities in this shift
             # Get all maintenance activity variables for this vehicle in this shift
             maint_active_in_shift = False
-            for instance in all_maint_instances:
-                if instance["vehicle_id"] == vehicle_id:
-                    instance_id = instance["id"]
-                    # Check if this maintenance instance is active in this shift
-                    if (instance_id, curr_shift_idx) in maint_active_s:
-                        maint_active_lit = maint_active_s[(instance_id, curr_shift_idx)]
-                        maint_active_in_shift = True
-                        
-                        # If maintenance is active, the vehicle's location doesn't change
-                        if curr_shift_idx + 1 < len(all_shifts_with_initial):
-                            model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])\
-                                .OnlyEnforceIf(maint_active_lit)
+            for instance in instances_by_vehicle[vehicle_id]:
+                instance_id = instance["id"]
+                # Check if this maintenance instance is active in this shift
+                if (instance_id, curr_shift_idx) in maint_active_s:
+                    maint_active_lit = maint_active_s[(instance_id, curr_shift_idx)]
+                    maint_active_in_shift = True
+                    
+                    # If maintenance is active, the vehicle's location doesn't change
+                    if curr_shift_idx + 1 < num_shifts:
+                        model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])\
+                            .OnlyEnforceIf(maint_active_lit)
             
-            # If vehicle is idle during this shift (not assigned to any route)
-            # Create a literal for the idle state
-            if shift_routes:
+            # Route assignment and idle state: a single table constraint links the vehicle's route choice
+            # in this shift to its locations at the start of this shift and the next one
+            if shift_routes and curr_shift_idx + 1 < num_shifts:
                 # Get all route assignment variables for this vehicle in this shift
                 vehicle_shift_vars = [assign_vr[(vehicle_id, route["id"])] for route in shift_routes]
                 
-                # Create a Boolean variable for the idle state (1 if idle, 0 if assigned to a route)
-                idle_var_name = f"idle_{vehicle_id}_{day}_{shift}"
-                idle_lit = model.NewBoolVar(idle_var_name)
-                
-                # idle_lit is true if and only if the vehicle is not assigned to any route
-                model.Add(sum(vehicle_shift_vars) == 0).OnlyEnforceIf(idle_lit)
-                model.Add(sum(vehicle_shift_vars) > 0).OnlyEnforceIf(idle_lit.Not())
+                # route_choice = 0 if the vehicle is idle, k if it is assigned to the k-th route of the shift
+                # (C2 ensures at most one of the route assignments is true)
+                route_choice_var_name = f"route_choice_{vehicle_id}_{day}_{shift}" if debug_names else ""
+                route_choice = model.NewIntVar(0, len(shift_routes), route_choice_var_name)
+                model.Add(route_choice == cp_model.LinearExpr.WeightedSum(vehicle_shift_vars, range(1, len(vehicle_shift_vars) + 1)))
+                
+                # If vehicle is assigned to a route, its current location must match the route start location
+                # and its next location (at the start of next shift) must match the route end location
+                allowed_assignments = [
+                    (k, location_id_to_index[route["start_location"]], location_id_to_index[route["end_location"]])
+                    for k, route in enumerate(shift_routes, 1)
+                ]
+                
+                # If vehicle is idle and not under maintenance, its location doesn't change.
+                # Under maintenance the location continuity is enforced by the maintenance literals
+                if maint_active_in_shift:
+                    allowed_assignments += [(0, loc_curr, loc_next) for loc_curr in range(len(location_ids))
+                                            for loc_next in range(len(location_ids))]
+                else:
+                    allowed_assignments += [(0, loc_index, loc_index) for loc_index in range(len(location_ids))]
                 
-                # If vehicle is idle and not under maintenance, its location doesn't change
-                if curr_shift_idx + 1 < len(all_shifts_with_initial) and not maint_active_in_shift:
-                    model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])\
-                        .OnlyEnforceIf(idle_lit)
+                model.AddAllowedAssignments(
+                    [route_choice, loc_start_vs[(vehicle_id, curr_shift_idx)], loc_start_vs[(vehicle_id, curr_shift_idx + 1)]],
+                    allowed_assignments)
             
             # NEW: Enforce location continuity for night shifts
             # If this is a night shift, the vehicle's location at the end of the night shift
             # must be the same as its location at the start of the next day shift
-            if shift == "night" and curr_shift_idx + 1 < len(all_shifts_with_initial):
-                next_day, next_shift = all_shifts_with_initial[curr_shift_idx + 1]
+            if shift == "night" and curr_shift_idx + 1 < num_shifts:
+                next_shift = shift_names[curr_shift_idx + 1]
                 
                 # Only apply if the next shift is a day shift
                 if next_shift == "day":
-                    # Create a Boolean variable for the night shift state
-                    night_var_name = f"night_{vehicle_id}_{day}_{shift}"
-                    night_lit = model.NewBoolVar(night_var_name)
-                    
-                    # night_lit is always true for night shifts
-                    model.Add(night_lit == 1)
-                    
-                    # If it's a night shift, the vehicle's location at the start of the next day shift
+                    # The vehicle's location at the start of the next day shift
                     # must be the same as its location at the start of this night shift
-                    model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])\
-                        .OnlyEnforceIf(night_lit)
+                    model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])
             
             # NEW: Enforce location continuity for transitions between day and night shifts
             # If this is a day shift, the vehicle's location at the start of the next night shift
             # must be the same as its location at the end of this day shift
-            if shift == "day" and curr_shift_idx + 1 < len(all_shifts_with_initial):
-                next_day, next_shift = all_shifts_with_initial[curr_shift_idx + 1]
+            if shift == "day" and curr_shift_idx + 1 < num_shifts:
+                next_shift = shift_names[curr_shift_idx + 1]
                 
                 # Only apply if the next shift is a night shift
                 if next_shift == "night":
-                    # Check if the vehicle is assigned to any route in this day shift
-                    assigned_to_route = False
-                    for route in shift_routes:
-                        route_id = route["id"]
-                        if (vehicle_id, route_id) in assign_vr:
-                            route_assigned_lit = assign_vr[(vehicle_id, route_id)]
-                            
-                            # If the vehicle is assigned to this route, its location at the start of the next night shift
-                            # must be the same as the route's end location
-                            if curr_shift_idx + 1 < len(all_shifts_with_initial):
-                                end_location = route["end_location"]
-                                end_location_index = location_id_to_index[end_location]
-                                model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == end_location_index)\
-                                    .OnlyEnforceIf(route_assigned_lit)
-                            
-                            assigned_to_route = True
-                    
-                    # If the vehicle is not assigned to any route and not under maintenance,
+                    # The end location of an assigned route is already enforced by the route table constraint
+                    # If there are no routes in this day shift and the vehicle is not under maintenance,
                     # its location at the start of the next night shift must be the same as its location at the start of this day shift
-                    if not assigned_to_route and not maint_active_in_shift:
+                    if not shift_routes and not maint_active_in_shift:
                         model.Add(loc_start_vs[(vehicle_id, curr_shift_idx + 1)] == loc_start_vs[(vehicle_id, curr_shift_idx)])
     
     # C5: Location Capacity Constraint - Ensure number of vehicles at each location doesn't exceed capacity
-    for idx, (day, shift) in enumerate(all_shifts_with_initial):
+    # Channel each location variable into one Boolean per location: at_loc[(v, s, k)] is 1 iff
+    # loc_start_vs[(v, s)] == k. A single map-domain constraint per (vehicle, shift) replaces a pair
+    # of reified (in)equalities per (vehicle, location, shift)
+    at_loc = {}
+    for vehicle in vehicles:
+        vehicle_id = vehicle["id"]
+        for idx in range(num_shifts):
+            at_loc_bools = [
+                model.NewBoolVar(f"at_loc_{vehicle_id}_{location_ids[loc_index]}_{shift_days[idx]}_{shift_names[idx]}"
+                                 if debug_names else "")
+                for loc_index in range(len(location_ids))
+            ]
+            model.AddMapDomain(loc_start_vs[(vehicle_id, idx)], at_loc_bools)
+            for loc_index, at_loc_bool in enumerate(at_loc_bools):
+                at_loc[(vehicle_id, idx, loc_index)] = at_loc_bool
+    
+    for idx in range(num_shifts):
         # For each location
         for loc_id, loc_data in locations.items():
             loc_index = location_id_to_index[loc_id]
             capacity = loc_data["capacity"]
             
-            # Get all vehicle location variables for this shift
-            vehicles_at_loc = []
-            for vehicle in vehicles:
-                vehicle_id = vehicle["id"]
-                # Create a Boolean variable that is 1 if the vehicle is at this location, 0 otherwise
-                is_at_loc_var_name = f"is_at_loc_{vehicle_id}_{loc_id}_{day}_{shift}"
-                is_at_loc = model.NewBoolVar(is_at_loc_var_name)
-                
-                # Link the Boolean variable to the location variable
-                model.Add(loc_start_vs[(vehicle_id, idx)] == loc_index).OnlyEnforceIf(is_at_loc)
-                model.Add(loc_start_vs[(vehicle_id, idx)] != loc_index).OnlyEnforceIf(is_at_loc.Not())
-                
-                vehicles_at_loc.append(is_at_loc)
-            
             # Add constraint: sum of vehicles at this location must be at most the capacity
-            model.Add(sum(vehicles_at_loc) <= capacity)
+            model.Add(cp_model.LinearExpr.Sum([at_loc[(vehicle["id"], idx, loc_index)] for vehicle in vehicles]) <= capacity)
     
     # C6: KM Accumulation - Track vehicle kilometers based on route assignments
     # Set initial KM for each vehicle
@@ -531,12 +529,12 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
     # For each depot, create a cumulative constraint for manhour resources
     
     # Track maintenance demands by depot and shift
-    # Structure: depot_maint_demands[depot_id][shift_idx] = list of (interval_var, demand) tuples
+    # Structure: depot_maint_demands[depot_id][shift_idx] = list of linear demand terms
     depot_maint_demands = {}
     for loc_id, loc_data in locations.items():
         if loc_data["type"] == "depot":
             depot_maint_demands[loc_id] = {}
-            for idx, (day, shift) in enumerate(all_shifts_with_initial):
+            for idx in range(num_shifts):
                 depot_maint_demands[loc_id][idx] = []
     
     # For each maintenance instance, add its manhour demand to the appropriate depot and shifts
@@ -547,86 +545,70 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         required_manhours = instance["required_manhours"]
         start_idx = instance["start_idx"]
         
-        # Get the maintenance type to determine duration
-        maint_type = next((mt for mt in maintenance_types if mt["id"] == maint_id), None)
-        if not maint_type:
-            continue
-        
-        # Estimate duration based on required manhours (same as in interval creation)
-        est_duration = min(max(1, required_manhours // 8), max_maint_duration)  # Rough estimate: 8 hours per shift
+        # Estimated duration of the maintenance (same as in interval creation)
+        est_duration = instance["est_duration"]
         
-        # Calculate manhours per shift (divide total manhours evenly across shifts)
-        manhours_per_shift = required_manhours / est_duration
+        # Calculate manhours per shift (divide total manhours evenly across shifts in integer arithmetic,
+        # with the remainder added to the first shift so that no manhours are lost)
+        manhours_per_shift, remainder_manhours = divmod(required_manhours, est_duration)
         
-        # For each potential depot
-        for loc_id, loc_data in locations.items():
-            if loc_data["type"] == "depot":
-                # Get the depot index
-                depot_index = location_id_to_index[loc_id]
-                
-                # Create a Boolean variable that is 1 if this maintenance is performed at this depot
-                is_at_depot_var_name = f"is_at_depot_{instance_id}_{loc_id}"
-                is_at_depot = model.NewBoolVar(is_at_depot_var_name)
-                
-                # Link the Boolean variable to the depot assignment
-                model.Add(maint_assigned_depot[instance_id] == depot_index).OnlyEnforceIf(is_at_depot)
-                model.Add(maint_assigned_depot[instance_id] != depot_index).OnlyEnforceIf(is_at_depot.Not())
-                
-                # For each shift in the potential maintenance interval
-                for s_idx in range(start_idx, min(start_idx + est_duration, len(all_shifts_with_initial))):
-                    # Create a Boolean variable that is 1 if maintenance is active at this depot during this shift
-                    active_at_depot_var_name = f"active_at_depot_{instance_id}_{loc_id}_{s_idx}"
-                    active_at_depot = model.NewBoolVar(active_at_depot_var_name)
-                    
-                    # active_at_depot is true if and only if:
-                    # 1. The maintenance is active during this shift (maint_active_s is true)
-                    # 2. The maintenance is assigned to this depot (is_at_depot is true)
-                    model.AddBoolAnd([maint_active_s[(instance_id, s_idx)], is_at_depot]).OnlyEnforceIf(active_at_depot)
-                    model.AddBoolOr([maint_active_s[(instance_id, s_idx)].Not(), is_at_depot.Not()]).OnlyEnforceIf(active_at_depot.Not())
-                    
-                    # Create an integer variable for the manhour demand
-                    demand_var_name = f"manhour_demand_{instance_id}_{loc_id}_{s_idx}"
-                    demand_var = model.NewIntVar(0, int(manhours_per_shift), demand_var_name)
-                    
-                    # If active_at_depot is true, demand_var = manhours_per_shift, otherwise 0
-                    model.Add(demand_var == int(manhours_per_shift)).OnlyEnforceIf(active_at_depot)
-                    model.Add(demand_var == 0).OnlyEnforceIf(active_at_depot.Not())
-                    
-                    # Add to the list of demands for this depot and shift
-                    depot_maint_demands[loc_id][s_idx].append(demand_var)
+        # For each depot that can perform this maintenance (the domain of maint_assigned_depot)
+        for depot_index in specialization_depot_indices.get(instance["specialization"], depot_indices):
+            loc_id = index_to_location_id[depot_index]
+            
+            # The maintenance is performed at this depot exactly when it is performed and the vehicle is at
+            # this depot at the start of the maintenance (C8 ties the vehicle's location to the assigned depot),
+            # so the location channel at_loc (see C5) serves as the depot literal instead of a reified
+            # maint_assigned_depot == depot_index Boolean
+            is_at_depot = at_loc[(vehicle_id, start_idx, depot_index)]
+            
+            # Create a Boolean variable that is 1 if maintenance is active at this depot
+            # The maintenance is active during every shift of its interval exactly when it is performed
+            # (maint_active_s aliases maint_performed), so one variable serves all shifts of the interval
+            active_at_depot_var_name = f"active_at_depot_{instance_id}_{loc_id}" if debug_names else ""
+            active_at_depot = model.NewBoolVar(active_at_depot_var_name)
+            
+            # active_at_depot is true if and only if:
+            # 1. The maintenance is performed (maint_performed is true)
+            # 2. The vehicle is at this depot at the start of the maintenance (is_at_depot is true)
+            model.Add(active_at_depot <= maint_performed[instance_id])
+            model.Add(active_at_depot <= is_at_depot)
+            model.Add(active_at_depot >= maint_performed[instance_id] + is_at_depot - 1)
+            
+            # For each shift in the potential maintenance interval, the manhour demand is
+            # manhours_per_shift (plus the remainder in the first shift) if active_at_depot is true, otherwise 0
+            for s_idx in range(start_idx, min(start_idx + est_duration, num_shifts)):
+                shift_manhours = manhours_per_shift + remainder_manhours if s_idx == start_idx else manhours_per_shift
+                depot_maint_demands[loc_id][s_idx].append(shift_manhours * active_at_depot)
     
     # Add cumulative constraints for each depot and shift
     for loc_id, loc_data in locations.items():
         if loc_data["type"] == "depot":
             manhours_per_shift = loc_data["manhours_per_shift"]
             
-            # For each shift in the planning horizon
-            for idx, (day, shift) in enumerate(all_shifts_with_initial):
-                # Skip the initial state
-                if day == 0 and shift == "initial":
-                    continue
-                
+            # For each shift in the planning horizon (skipping the initial state)
+            for idx in range(1, num_shifts):
                 # Get all demands for this depot and shift
                 demands = depot_maint_demands[loc_id][idx]
                 
                 # If there are demands, add a constraint to ensure total demand <= capacity
                 if demands:
-                    model.Add(sum(demands) <= manhours_per_shift)
+                    model.Add(cp_model.LinearExpr.Sum(demands) <= manhours_per_shift)
     
     # C8: Force Corrective Maintenance - Ensure at least one instance of each pending corrective task is performed
     # For each vehicle with pending corrective tasks
     for vehicle in vehicles:
+        pending_tasks = vehicle.get("pending_corrective_tasks")
+        if not pending_tasks:
+            continue
         vehicle_id = vehicle["id"]
         
         # For each pending corrective task
-        for pending_task in vehicle.get("pending_corrective_tasks", []):
+        for pending_task in pending_tasks:
             maint_id = pending_task["maintenance_type_id"]
             
             # Find all maintenance instances for this vehicle and maintenance type
-            task_instances = []
-            for instance in all_maint_instances:
-                if instance["vehicle_id"] == vehicle_id and instance["maint_id"] == maint_id:
-                    task_instances.append(instance["id"])
+            task_instances = [instance["id"] for instance in instances_by_vehicle_type.get((vehicle_id, maint_id), [])]
             
             # If there are instances, add a constraint to ensure at least one is performed
             if task_instances:
@@ -634,22 +616,22 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                 performed_vars = [maint_performed[instance_id] for instance_id in task_instances]
                 
                 # Add constraint: at least one instance must be performed
-                model.Add(sum(performed_vars) >= 1)
+                model.Add(cp_model.LinearExpr.Sum(performed_vars) >= 1)
     
     # C9: Force Preventive Maintenance - Ensure at least one instance of each pending preventive task is performed
     # For each vehicle with pending preventive tasks
     for vehicle in vehicles:
+        pending_tasks = vehicle.get("pending_preventive_tasks")
+        if not pending_tasks:
+            continue
         vehicle_id = vehicle["id"]
         
         # For each pending preventive task
-        for pending_task in vehicle.get("pending_preventive_tasks", []):
+        for pending_task in pending_tasks:
             maint_id = pending_task["maintenance_type_id"]
             
             # Find all maintenance instances for this vehicle and maintenance type
-            task_instances = []
-            for instance in all_maint_instances:
-                if instance["vehicle_id"] == vehicle_id and instance["maint_id"] == maint_id:
-                    task_instances.append(instance["id"])
+            task_instances = [instance["id"] for instance in instances_by_vehicle_type.get((vehicle_id, maint_id), [])]
             
             # If there are instances, add a constraint to ensure at least one is performed
             if task_instances:
@@ -657,12 +639,70 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                 performed_vars = [maint_performed[instance_id] for instance_id in task_instances]
                 
                 # Add constraint: at least one instance must be performed
-                model.Add(sum(performed_vars) >= 1)
+                model.Add(cp_model.LinearExpr.Sum(performed_vars) >= 1)
+    
+    # Warm start: hint a greedy route assignment and the resulting vehicle locations to the solver
+    # Each route is assigned to the free vehicle with the lowest km at its start location (or, if there
+    # is none, to the free vehicle with the lowest km); vehicles only move when they run a route
+    greedy_location = {vehicle["id"]: location_id_to_index[vehicle["initial_location"]] for vehicle in vehicles}
+    greedy_km = {vehicle["id"]: vehicle["initial_km"] for vehicle in vehicles}
+    greedy_route_vehicle = {}
+    greedy_locations = {}  # (vehicle_id, shift_idx) -> location index at the start of the shift
+    greedy_busy = set()  # (vehicle_id, shift_idx) pairs where the vehicle runs a route
+    for idx in range(num_shifts):
+        for vehicle_id, location_index in greedy_location.items():
+            model.AddHint(loc_start_vs[(vehicle_id, idx)], location_index)
+            greedy_locations[(vehicle_id, idx)] = location_index
+        
+        free_vehicle_ids = set(greedy_location)
+        for route in routes_by_shift_idx[idx]:
+            if not free_vehicle_ids:
+                break
+            start_location_index = location_id_to_index[route["start_location"]]
+            candidates = [vehicle_id for vehicle_id in free_vehicle_ids
+                          if greedy_location[vehicle_id] == start_location_index] or free_vehicle_ids
+            vehicle_id = min(candidates, key=lambda candidate: (greedy_km[candidate], candidate))
+            free_vehicle_ids.remove(vehicle_id)
+            greedy_busy.add((vehicle_id, idx))
+            greedy_route_vehicle[route["id"]] = vehicle_id
+            greedy_location[vehicle_id] = location_id_to_index[route["end_location"]]
+            greedy_km[vehicle_id] += route["distance_km"]
+    
+    for (vehicle_id, route_id), assign_var in assign_vr.items():
+        model.AddHint(assign_var, int(greedy_route_vehicle.get(route_id) == vehicle_id))
+    
+    # Hint maintenance: each pending task is performed at the first start shift where the greedy plan
+    # leaves the vehicle idle at a capable depot for the whole maintenance, and its other instances are
+    # not performed. Instances of tasks that are not pending never need to be performed. Pending tasks
+    # without such a start shift are left unhinted
+    pending_task_keys = set()
+    for vehicle in vehicles:
+        for pending_task in vehicle.get("pending_preventive_tasks", []) + vehicle.get("pending_corrective_tasks", []):
+            pending_task_keys.add((vehicle["id"], pending_task["maintenance_type_id"]))
+    
+    for (vehicle_id, maint_id), task_instances in instances_by_vehicle_type.items():
+        greedy_instance = None
+        if (vehicle_id, maint_id) in pending_task_keys:
+            for instance in task_instances:
+                start_idx = instance["start_idx"]
+                location_index = greedy_locations[(vehicle_id, start_idx)]
+                capable_depot_indices = specialization_depot_indices.get(instance["specialization"], depot_indices)
+                maint_shifts = range(start_idx, min(start_idx + instance["est_duration"], num_shifts))
+                if location_index in capable_depot_indices and \
+                   not any((vehicle_id, s_idx) in greedy_busy for s_idx in maint_shifts):
+                    greedy_instance = instance
+                    break
+            if greedy_instance is None:
+                continue
+            model.AddHint(maint_assigned_depot[greedy_instance["id"]], greedy_locations[(vehicle_id, greedy_instance["start_idx"])])
+        
+        for instance in task_instances:
+            model.AddHint(maint_performed[instance["id"]], int(instance is greedy_instance))
     
     # Set the objective function: Minimize the sum of deviation variables
     # This minimizes the total deviation from optimal KM for all preventive maintenance tasks
     if deviation_vars:
-        model.Minimize(sum(deviation_vars))
+        model.Minimize(cp_model.LinearExpr.Sum(deviation_vars))
     
     # Create a solver and solve the model
     solver = cp_model.CpSolver()
@@ -670,13 +710,23 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
     # Set time limit
     solver.parameters.max_time_in_seconds = time_limit_seconds
     
+    # Run a portfolio of search workers in parallel (they share solutions and learned clauses)
+    if num_workers is None:
+        num_workers = max(1, os.cpu_count() or 4)
+    solver.parameters.num_workers = num_workers
+    solver.parameters.log_search_progress = log_search_progress
+    
+    # Apply tuned parameters (e.g. from an offline tuning run), overriding the settings above
+    for param_name, param_value in (sat_parameters or {}).items():
+        setattr(solver.parameters, param_name, param_value)
+    
     # Solve the model
     status = solver.Solve(model)
     
     # Process results
     results = {
         "status": solver.StatusName(status),
-        "status_code": status,
+        "status_code": int(status),
         "wall_time": solver.WallTime(),
     }
     
@@ -685,25 +735,44 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
         # Extract and format detailed results for visualization
         schedule_results = {}
         
+        # Read all variable values from the response at once (indexed by variable index)
+        # instead of querying the solver for each variable
+        solution = np.asarray(solver.ResponseProto().solution, dtype=np.int64)
+        
+        def value(var) -> int:
+            return int(solution[var.Index()])
+        
         # 1. Extract route assignments for each vehicle and shift
+        # Read the (route, vehicle) assignment matrix in one step; each route is assigned to exactly
+        # one vehicle (C1), so the assigned vehicle is the position of the 1 in the route's row
+        route_shift_indices = [idx for idx in range(1, num_shifts) for _ in routes_by_shift_idx[idx]]
+        extracted_routes = [route for idx in range(1, num_shifts) for route in routes_by_shift_idx[idx]]
+        assign_var_indices = np.array([
+            [assign_vr[(vehicle["id"], route["id"])].Index() for vehicle in vehicles]
+            for route in extracted_routes
+        ], dtype=np.int64).reshape(len(extracted_routes), len(vehicles))
+        assigned_vehicle_indices = solution[assign_var_indices].argmax(axis=1)
+        
+        # Mark the shifts each vehicle runs a route and map each (vehicle, shift index) to its route
+        on_route = np.zeros((len(vehicles), num_shifts), dtype=bool)
+        on_route[assigned_vehicle_indices, route_shift_indices] = True
+        assigned_routes = {
+            (vehicles[vehicle_idx]["id"], idx): route
+            for vehicle_idx, idx, route in zip(assigned_vehicle_indices.tolist(), route_shift_indices, extracted_routes)
+        }
+        
         route_assignments = {}
         for vehicle in vehicles:
             vehicle_id = vehicle["id"]
             route_assignments[vehicle_id] = {}
             
-            for idx, (day, shift) in enumerate(all_shifts_with_initial):
-                # Skip the initial state
-                if day == 0 and shift == "initial":
-                    continue
-                    
+            # Skip the initial state
+            for idx in range(1, num_shifts):
+                day, shift = shift_days[idx], shift_names[idx]
+                
                 # Find if this vehicle is assigned to any route in this shift
-                assigned_route = None
-                for route in routes_by_day_shift.get((day, shift), []):
-                    route_id = route["id"]
-                    if (vehicle_id, route_id) in assign_vr and solver.Value(assign_vr[(vehicle_id, route_id)]):
-                        assigned_route = route
-                        break
-                        
+                assigned_route = assigned_routes.get((vehicle_id, idx))
+                
                 # Store the assignment for this shift
                 shift_key = f"{day}_{shift}"
                 if assigned_route:
@@ -717,110 +786,100 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                     route_assignments[vehicle_id][shift_key] = None
         
         # 2. Extract maintenance schedules
+        # Also mark the shifts (from start shift to end shift, inclusive) each vehicle is under maintenance
         maintenance_schedules = {}
-        for vehicle in vehicles:
+        under_maintenance = np.zeros((len(vehicles), num_shifts), dtype=bool)
+        for vehicle_idx, vehicle in enumerate(vehicles):
             vehicle_id = vehicle["id"]
             maintenance_schedules[vehicle_id] = []
             
             # Find all maintenance activities performed for this vehicle
-            for instance in all_maint_instances:
-                if instance["vehicle_id"] != vehicle_id:
-                    continue
-                    
+            for instance in instances_by_vehicle[vehicle_id]:
                 instance_id = instance["id"]
-                if solver.Value(maint_performed[instance_id]):
+                if value(maint_performed[instance_id]):
                     # Get maintenance details
-                    maint_type = next((mt for mt in maintenance_types if mt["id"] == instance["maint_id"]), None)
                     start_idx = instance["start_idx"]
-                    start_day, start_shift = all_shifts_with_initial[start_idx]
+                    start_day, start_shift = shift_days[start_idx], shift_names[start_idx]
                     
                     # Get assigned depot (convert index back to ID)
-                    depot_index = solver.Value(maint_assigned_depot[instance_id])
+                    depot_index = value(maint_assigned_depot[instance_id])
                     depot_id = index_to_location_id[depot_index]
                     
                     # Get KM at maintenance start
-                    km_at_start = solver.Value(km_at_maint_start[instance_id])
+                    km_at_start = value(km_at_maint_start[instance_id])
                     
                     # Calculate end shift based on estimated duration
                     required_manhours = instance["required_manhours"]
-                    est_duration = min(max(1, required_manhours // 8), max_maint_duration)
-                    end_idx = min(start_idx + est_duration, len(all_shifts_with_initial) - 1)
-                    end_day, end_shift = all_shifts_with_initial[end_idx]
+                    est_duration = instance["est_duration"]
+                    end_idx = min(start_idx + est_duration, num_shifts - 1)
+                    end_day, end_shift = shift_days[end_idx], shift_names[end_idx]
+                    under_maintenance[vehicle_idx, start_idx:end_idx + 1] = True
                     
                     # Add to maintenance schedules
                     maintenance_schedules[vehicle_id].append({
                         "maintenance_id": instance["maint_id"],
-                        "maintenance_type": maint_type["type"],  # 'preventive' or 'corrective'
+                        "maintenance_type": instance["maint_type"],  # 'preventive' or 'corrective'
                         "start_day": start_day,
                         "start_shift": start_shift,
                         "end_day": end_day,
                         "end_shift": end_shift,
+                        "start_idx": start_idx,  # Shift indices (0 is the initial state) for integer comparisons
+                        "end_idx": end_idx,
                         "depot": depot_id,
                         "km_at_start": km_at_start,
                         "required_manhours": required_manhours
                     })
         
         # 3. Extract vehicle locations and KM for each shift
-        vehicle_states = {}
-        for vehicle in vehicles:
-            vehicle_id = vehicle["id"]
-            vehicle_states[vehicle_id] = {}
-            
-            for idx, (day, shift) in enumerate(all_shifts_with_initial):
-                # Skip the initial state in the output (but use it for calculations)
-                if day == 0 and shift == "initial":
-                    continue
-                    
-                # Get location and KM at this shift
-                location_index = solver.Value(loc_start_vs[(vehicle_id, idx)])
-                location_id = index_to_location_id[location_index]
-                km = solver.Value(km_at_shift_start[(vehicle_id, idx)])
-                
-                # Determine if the vehicle is idle (not assigned to a route and not under maintenance)
-                is_idle = True
-                
-                # Check if assigned to a route
-                shift_key = f"{day}_{shift}"
-                if route_assignments[vehicle_id][shift_key] is not None:
-                    is_idle = False
-                
-                # Check if under maintenance
-                is_under_maintenance = False
-                for maint in maintenance_schedules[vehicle_id]:
-                    maint_start_day = maint["start_day"]
-                    maint_start_shift = maint["start_shift"]
-                    maint_end_day = maint["end_day"]
-                    maint_end_shift = maint["end_shift"]
-                    
-                    # Check if this shift is within the maintenance period
-                    if (day > maint_start_day or (day == maint_start_day and shift >= maint_start_shift)) and \
-                       (day < maint_end_day or (day == maint_end_day and shift <= maint_end_shift)):
-                        is_under_maintenance = True
-                        is_idle = False
-                        break
-                
-                # Store the state for this shift
-                vehicle_states[vehicle_id][shift_key] = {
-                    "location": location_id,
-                    "km": km,
-                    "is_idle": is_idle,
-                    "is_under_maintenance": is_under_maintenance
-                }
+        # States are kept as arrays indexed by (vehicle index, shift index) and only
+        # converted to per-shift dicts when the JSON output is built
+        # Gather the variable indices of the state variables and read their values in one step
+        loc_var_indices = np.array([
+            [loc_start_vs[(vehicle["id"], idx)].Index() for idx in range(num_shifts)]
+            for vehicle in vehicles
+        ], dtype=np.int64)
+        km_var_indices = np.array([
+            [km_at_shift_start[(vehicle["id"], idx)].Index() for idx in range(num_shifts)]
+            for vehicle in vehicles
+        ], dtype=np.int64)
+        state_locations = solution[loc_var_indices].astype(np.int32)
+        state_km = solution[km_var_indices]
+        
+        # A vehicle is idle when it is neither assigned to a route nor under maintenance
+        is_idle = ~(on_route | under_maintenance)
         
         # 4. Combine all results into the schedule_results structure
+        # The small optimization_info header comes first so that readers streaming the file
+        # get it before the vehicle schedules
         schedule_results = {
-            "vehicles": {},
             "optimization_info": {
                 "status": solver.StatusName(status),
                 "wall_time": solver.WallTime(),
                 "objective_value": solver.ObjectiveValue() if status == cp_model.OPTIMAL else None
-            }
+            },
+            "vehicles": {}
         }
         
         # Add detailed vehicle schedules
-        for vehicle in vehicles:
+        shift_keys = [f"{shift_days[idx]}_{shift_names[idx]}" for idx in range(num_shifts)]
+        for vehicle_idx, vehicle in enumerate(vehicles):
             vehicle_id = vehicle["id"]
             
+            # Convert this vehicle's state arrays into per-shift dicts
+            vehicle_locations = state_locations[vehicle_idx].tolist()
+            kms = state_km[vehicle_idx].tolist()
+            idle = is_idle[vehicle_idx].tolist()
+            maintenance = under_maintenance[vehicle_idx].tolist()
+            vehicle_states = {
+                shift_keys[idx]: {
+                    "location": index_to_location_id[vehicle_locations[idx]],
+                    "km": kms[idx],
+                    "is_idle": idle[idx],
+                    "is_under_maintenance": maintenance[idx]
+                }
+                for idx in range(1, num_shifts)
+            }
+            
             schedule_results["vehicles"][vehicle_id] = {
                 "initial_state": {
                     "location": vehicle["initial_location"],
@@ -828,22 +887,18 @@ def solve_rail_optimization(data: Dict[str, Any], time_limit_seconds: int = 60)
                 },
                 "route_assignments": route_assignments[vehicle_id],
                 "maintenance_activities": maintenance_schedules[vehicle_id],
-                "states": vehicle_states[vehicle_id]
+                "states": vehicle_states
             }
         
         # Add the schedule results to the output
         results["schedule_results"] = schedule_results
         
         # Save the schedule results to a JSON file for visualization
-        import json
-        import os
-        
         # Ensure the output directory exists
         os.makedirs("output", exist_ok=True)
         
         # Save the schedule results to a JSON file
-        with open("output/schedule_results.json", "w") as f:
-            json.dump(schedule_results, f, indent=2)
+        dump_json(schedule_results, "output/schedule_results.json")
     
     return results
 
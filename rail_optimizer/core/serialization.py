@@ -0,0 +1,172 @@
+"""
+Serialization module for the Rail Operations & Maintenance Optimizer.
+
+This module provides functions to read and write JSON files. orjson is used
+when it is installed; otherwise the standard library json module is used.
+Large documents are read incrementally with ijson when it is installed.
+Files are written atomically, so concurrent readers never see a partially
+written document.
+"""
+import contextlib
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+@contextlib.contextmanager
+def _open_atomic(filepath: str, mode: str) -> Iterator[Any]:
+    """
+    Open a temporary file next to filepath for writing and move it into place
+    once it has been written completely (it is removed if writing fails).
+    """
+    # The temporary name is unique per process and thread, as several of them may write the same file
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+def dump_json(data: Any, filepath: str, indent: bool = True) -> None:
+    """
+    Save data to a JSON file, indented with two spaces or (indent=False) compact.
+    
+    With orjson, NumPy values and non-string dict keys are serialized natively.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        with _open_atomic(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with _open_atomic(filepath, 'w') as f:
+            if indent:
+                json.dump(data, f, indent=2)
+            else:
+                json.dump(data, f, separators=(",", ":"))
+
+def load_json(filepath: str) -> Any:
+    """Load data from a JSON file."""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+def load_json_streamed(filepath: str, header_keys: Iterable[str],
+                       section_key: str) -> Tuple[Dict[str, Any], Iterator[Tuple[str, Any]]]:
+    """
+    Load selected top-level values of a JSON object file and iterate over the
+    entries of one of its sections.
+    
+    With ijson, the file is parsed once, incrementally: the header values that
+    precede the section are loaded before returning, and the section entries
+    are parsed one at a time while iterating, so the section is never
+    materialized in memory. Header values that follow the section are added
+    to the header dict once the entries have been iterated. Otherwise the
+    whole file is loaded once.
+    
+    Args:
+        filepath: Path of the JSON file to read
+        header_keys: Top-level keys whose values are loaded (missing keys are skipped)
+        section_key: Top-level key of the object whose entries are iterated
+        
+    Returns:
+        Tuple of (dict of the loaded header values, iterator of (key, value) section entries)
+    """
+    if ijson is None:
+        data = load_json(filepath)
+        header = {key: data[key] for key in header_keys if key in data}
+        return header, iter(data.get(section_key, {}).items())
+    
+    header_keys = set(header_keys)
+    header = {}
+    f = open(filepath, 'rb')
+    try:
+        events = ijson.parse(f, use_float=True)
+        
+        # Load the header values up to the start of the section
+        for prefix, event, value in events:
+            if prefix == '' and event == 'map_key':
+                if value == section_key:
+                    break
+                if value in header_keys:
+                    header[value] = _build_value(events)
+    except BaseException:
+        f.close()
+        raise
+    return header, _iter_json_section(f, events, header, header_keys, section_key)
+
+def _iter_json_section(f: BinaryIO, events: Iterator[Tuple[str, str, Any]], header: Dict[str, Any],
+                       header_keys: Set[str], section_key: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Build and yield the section entries from the remaining parse events, then
+    load the header values that follow the section.
+    """
+    with f:
+        for prefix, event, value in events:
+            if event == 'map_key':
+                if prefix == section_key:
+                    yield value, _build_value(events)
+                elif prefix == '' and value in header_keys:
+                    header[value] = _build_value(events)
+
+def _build_value(events: Iterator[Tuple[str, str, Any]]) -> Any:
+    """Build the next complete JSON value from ijson parse events."""
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+        if depth == 0:
+            break
+    return builder.value
+
+def dump_json_sections(sections: Iterable[Tuple[str, Iterable[Tuple[str, Any]]]], filepath: str) -> None:
+    """
+    Stream a JSON object made of named sections to a file.
+    
+    Each entry is encoded and written as soon as it is produced, one entry per
+    line, so the document is never materialized in memory. Sections and their
+    entries may therefore be generators.
+    
+    Args:
+        sections: Iterable of (section_key, entries) pairs, where entries is an
+            iterable of (key, value) pairs
+        filepath: Path of the JSON file to write
+    """
+    with _open_atomic(filepath, 'wb') as f:
+        f.write(b"{")
+        section_separator = b"\n  "
+        for section_key, entries in sections:
+            f.write(section_separator + _encode(section_key) + b": {")
+            section_separator = b",\n  "
+            entry_separator = b"\n    "
+            for key, value in entries:
+                f.write(entry_separator + _encode(key) + b": " + _encode(value))
+                entry_separator = b",\n    "
+            f.write(b"}" if entry_separator == b"\n    " else b"\n  }")
+        f.write(b"\n}\n")
+
+def _encode(value: Any) -> bytes:
+    """Encode a value as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
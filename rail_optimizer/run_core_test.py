@@ -9,8 +9,8 @@ from rail_optimizer.core.optimizer import solve_rail_optimization, print_optimiz
 
 def main():
     """Generate dummy data and run the optimization model."""
-    # Set a fixed seed for reproducibility
-    seed = 42
+    # Set a fixed seed for reproducibility (this instance has a feasible schedule)
+    seed = 29
     
     # Generate the dummy data
     print("Generating dummy data...")
@@ -5,7 +5,7 @@ This script calls the generate_dummy_data function and prints the output as JSON
 """
 import json
 import sys
-from core.data_generator import generate_dummy_data, save_dummy_data
+from rail_optimizer.core.data_generator import generate_dummy_data, save_dummy_data
 
 def main():
     """Generate dummy data and print it as JSON."""
@@ -0,0 +1,58 @@
+"""
+Test script for the JSON serialization helpers.
+
+This script checks that load_json_streamed returns the same header values and
+section entries as load_json, with ijson (when it is installed) and without it,
+and that dump_json leaves no temporary files behind.
+"""
+import os
+import tempfile
+from rail_optimizer.core import serialization
+from rail_optimizer.core.serialization import dump_json, load_json, load_json_streamed
+
+def check_streamed_load(filepath, header_keys, section_key):
+    """Compare load_json_streamed against load_json for one file."""
+    data = load_json(filepath)
+    header, entries = load_json_streamed(filepath, header_keys, section_key)
+    entries = list(entries)
+    
+    # Header values that follow the section are only available once the entries have been read
+    expected_header = {key: data[key] for key in header_keys if key in data}
+    assert header == expected_header, f"header {header} != {expected_header}"
+    expected_entries = list(data.get(section_key, {}).items())
+    assert entries == expected_entries, f"entries {entries} != {expected_entries}"
+
+def main():
+    """Run the streamed load checks on documents with the header before, after and without the section."""
+    vehicles = {
+        "vehicle_1": {"km": 1.5, "states": {"1_day": {"location": "depot_1", "is_idle": True}}, "tasks": [1, [2, 3]]},
+        "vehicle_2": {"km": 0, "states": {}, "tasks": []}
+    }
+    info = {"status": "OPTIMAL", "objective_value": None, "wall_time": 0.25}
+    documents = {
+        "header first": {"optimization_info": info, "vehicles": vehicles},
+        "header last": {"vehicles": vehicles, "other": {"vehicles": 1}, "optimization_info": info},
+        "no header": {"vehicles": vehicles},
+        "empty section": {"optimization_info": info, "vehicles": {}},
+        "no section": {"optimization_info": info}
+    }
+    
+    modes = [("ijson", serialization.ijson)] if serialization.ijson is not None else []
+    modes.append(("json", None))
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, "results.json")
+        for mode, ijson_module in modes:
+            serialization.ijson = ijson_module
+            for name, document in documents.items():
+                dump_json(document, filepath)
+                check_streamed_load(filepath, ["optimization_info"], "vehicles")
+                print(f"- {mode}: {name} OK")
+        
+        # Files are written through a temporary file that is moved into place
+        assert os.listdir(tmp_dir) == ["results.json"], f"leftover files: {os.listdir(tmp_dir)}"
+    
+    print("\nAll serialization checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,14 @@ def test_run_optimizer():
     try:
         response = requests.post(url, json=payload)
         
+        # A new optimization runs in the background: poll its job until it has finished
+        if response.status_code == 202:
+            status_url = f"{url}/status/{response.json()['job_id']}"
+            response = requests.get(status_url)
+            while response.status_code == 200 and response.json().get('status') == 'running':
+                time.sleep(1)
+                response = requests.get(status_url)
+        
         # Print response status
         print(f"Response status: {response.status_code}")
         
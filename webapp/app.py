@@ -4,14 +4,96 @@ Flask application for the Rail Operations & Maintenance Optimizer.
 This module sets up the Flask application and defines routes for the web interface.
 """
 import os
-import json
-from flask import Flask, render_template, jsonify, request
+import gzip
+import hashlib
+import collections
+import functools
+import multiprocessing
+import operator
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from rail_optimizer.core.data_generator import generate_dummy_data, generate_data_summary
+from rail_optimizer.core.optimizer import solve_rail_optimization
+from rail_optimizer.core.serialization import dump_json, load_json_streamed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson when it is installed.
+    
+    NumPy values and non-string dict keys are serialized natively. Without
+    orjson, Flask's default provider is used.
+    """
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string."""
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize data from a JSON string or bytes."""
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
 
 # Create the Flask application
 app = Flask(__name__)
+app.json_provider_class = OrjsonProvider
+app.json = OrjsonProvider(app)
 
-# Import routes after app creation to avoid circular imports
-from webapp import routes
+# Compress responses (brotli or gzip, as accepted by the client) when flask-compress is installed
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+if Compress is not None:
+    Compress(app)
+
+# Optimization jobs run in a worker process so that the solver doesn't block request handling;
+# their futures are kept by job ID until the results are fetched, or until they have been finished for
+# longer than _OPTIMIZER_JOB_TTL_SECONDS (finished jobs are evicted when a new job is submitted)
+# The executor is created by get_optimizer_executor on the first job
+_OPTIMIZER_EXECUTOR = None
+_OPTIMIZER_EXECUTOR_LOCK = threading.Lock()
+_OPTIMIZER_JOBS = {}
+_OPTIMIZER_JOB_FINISH_TIMES = {}  # job_id -> time.monotonic() when the job finished
+_OPTIMIZER_JOBS_LOCK = threading.Lock()
+_OPTIMIZER_JOB_TTL_SECONDS = 600
+
+# Generated data and optimization results of recent runs (least recently used first), keyed by the
+# values of the parameters in _OPTIMIZATION_CACHE_PARAMS
+_OPTIMIZATION_CACHE = collections.OrderedDict()
+_OPTIMIZATION_CACHE_LOCK = threading.Lock()
+_OPTIMIZATION_CACHE_SIZE = 32
+_OPTIMIZATION_CACHE_PARAMS = (
+    'num_vehicles', 'num_depots', 'num_parkings', 'num_routes_per_day', 'planning_days', 'seed', 'time_limit'
+)
+
+# Cache key of the run the output files were last written for by this process, with the modification
+# time of the data summary file after writing them (a different time means that another process, e.g.
+# the optimization job worker, has rewritten the files since); guarded by _OPTIMIZATION_CACHE_LOCK
+_OPTIMIZATION_FILES_WRITTEN = None
+
+# Serialized (plain and gzip-compressed) frontend results of the cached results file and their ETag, keyed by
+# (path, modification time, size) of the file so that a rewritten file is parsed again
+_RESULTS_CACHE = {}
 
 @app.route('/')
 def index():
@@ -32,98 +114,72 @@ def run_optimizer():
     API endpoint to run the optimization model.
     
     Request Parameters (optional):
-    - num_vehicles: Number of vehicles (default: 10)
+    - num_vehicles: Number of vehicles (default: 5)
     - num_depots: Number of depots (default: 2)
-    - num_parkings: Number of parkings (default: 2)
-    - num_routes_per_day: Number of routes per day (default: 8)
-    - planning_days: Number of planning days (default: 14)
-    - seed: Random seed (default: 42)
+    - num_parkings: Number of parkings (default: 1)
+    - num_routes_per_day: Number of routes per day (default: 4)
+    - planning_days: Number of planning days (default: 7)
+    - seed: Random seed (default: 46)
     - time_limit: Time limit in seconds (default: 60)
     - use_cached: Whether to use cached results from schedule_results.json (default: true)
     - regenerate: Whether to generate new data (default: false)
     
     Returns:
-        JSON response with optimization results or error message
+        JSON response with the cached optimization results (also available, with conditional
+        request support, at /run_optimizer/cached), or (HTTP 202) the ID of the optimization
+        job to poll at /run_optimizer/status/<job_id>, or an error message
     """
+    # Get parameters from request (default parameters, updated with the provided ones)
     try:
-        # Get parameters from request
-        data = request.get_json() or {}
-        
-        # Default parameters
-        params = {
+        params = parse_request_params({
             'num_vehicles': 5,
             'num_depots': 2,
-            'num_parkings': 2,
-            'num_routes_per_day': 8,
+            'num_parkings': 1,
+            'num_routes_per_day': 4,
             'planning_days': 7,
-            'seed': 42,
+            'seed': 46,
             'time_limit': 60,
             'use_cached': True,
             'regenerate': False
-        }
-        
-        # Update with provided parameters
-        params.update(data)
-        
+        })
+    except ValueError as e:
+        # Reject invalid parameters before any work is done
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'message': 'Invalid optimization parameters'
+        }), 400
+    
+    try:
         # Path to the cached results file
         results_file = os.path.join('output', 'schedule_results.json')
         
-        # Check if we should generate new data or use cached results
-        if params['regenerate']:
-            # Import the optimization module
-            from rail_optimizer.core.data_generator import generate_dummy_data, generate_data_summary
-            from rail_optimizer.core.optimizer import solve_rail_optimization
-            
-            # Generate dummy data
-            dummy_data = generate_dummy_data(
-                num_vehicles=params['num_vehicles'],
-                num_depots=params['num_depots'],
-                num_parkings=params['num_parkings'],
-                num_routes_per_day=params['num_routes_per_day'],
-                planning_days=params['planning_days'],
-                seed=params['seed']
-            )
-            
-            # Generate data summary
-            generate_data_summary(dummy_data)
-            
-            # Run the optimization model
-            results = solve_rail_optimization(dummy_data, time_limit_seconds=params['time_limit'])
-            
-            # Save the results to the schedule_results.json file
-            os.makedirs('output', exist_ok=True)
-            with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2)
-        elif params['use_cached'] and os.path.exists(results_file):
-            # Load the pre-computed results
-            with open(results_file, 'r') as f:
-                results = json.load(f)
-        else:
-            # Run the optimization from scratch
-            from rail_optimizer.core.data_generator import generate_dummy_data, generate_data_summary
-            from rail_optimizer.core.optimizer import solve_rail_optimization
-            
-            # Generate dummy data
-            dummy_data = generate_dummy_data(
-                num_vehicles=params['num_vehicles'],
-                num_depots=params['num_depots'],
-                num_parkings=params['num_parkings'],
-                num_routes_per_day=params['num_routes_per_day'],
-                planning_days=params['planning_days'],
-                seed=params['seed']
-            )
-            
-            # Generate data summary
-            generate_data_summary(dummy_data)
-            
-            # Run the optimization model
-            results = solve_rail_optimization(dummy_data, time_limit_seconds=params['time_limit'])
-        
-        # Format the results for the frontend
-        frontend_results = format_results_for_frontend(results)
-        
-        # Return the results
-        return jsonify(frontend_results)
+        # Return the pre-computed results, already formatted and serialized for the frontend,
+        # unless new data or a fresh optimization is requested
+        # (a missing results file is detected by the stat in load_cached_results, without a separate exists check)
+        if not params['regenerate'] and params['use_cached']:
+            try:
+                response_body, compressed_body, etag = load_cached_results(results_file)
+            except FileNotFoundError:
+                pass  # No cached results yet: run the optimization
+            else:
+                # Conditional requests (If-None-Match) are only answered by GET /run_optimizer/cached
+                return make_results_response(response_body, compressed_body)
+        
+        # Run the optimization in a background process; the client polls the status endpoint for the results
+        job_id = uuid.uuid4().hex
+        future = get_optimizer_executor().submit(run_optimization_job, params)
+        with _OPTIMIZER_JOBS_LOCK:
+            evict_expired_jobs()
+            _OPTIMIZER_JOBS[job_id] = future
+        
+        # Record when the job finishes (outside the lock, as the callback runs right away if it already has)
+        future.add_done_callback(functools.partial(record_job_finished, job_id))
+        
+        return jsonify({
+            'job_id': job_id,
+            'status': 'running'
+        }), 202
     
     except Exception as e:
         # Log the error
@@ -136,17 +192,479 @@ def run_optimizer():
             'message': 'An error occurred while running the optimization'
         }), 500
 
-def format_results_for_frontend(results):
+@app.route('/run_optimizer/cached')
+def run_optimizer_cached():
+    """
+    API endpoint to get the cached optimization results (of the last optimization).
+    
+    The results carry an ETag: a request whose If-None-Match header matches it gets an
+    empty 304 Not Modified response, as the client already has these results.
+    
+    Returns:
+        JSON response with the cached optimization results, or an error message (HTTP 404 if
+        there are no cached results)
+    """
+    try:
+        response_body, compressed_body, etag = load_cached_results(os.path.join('output', 'schedule_results.json'))
+    except FileNotFoundError:
+        return jsonify({
+            'status': 'error',
+            'error': 'Results not found',
+            'message': 'No cached results available. Run the optimization first.'
+        }), 404
+    except Exception as e:
+        # Log the error
+        app.logger.error(f"Error in run_optimizer_cached: {str(e)}")
+        
+        # Return error response
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'message': 'An error occurred while loading the cached results'
+        }), 500
+    
+    # The client already has these results
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    
+    response = make_results_response(response_body, compressed_body)
+    response.set_etag(etag, weak=True)
+    return response
+
+def make_results_response(response_body, compressed_body):
+    """
+    Create the response for serialized results, sending the compressed body to clients that accept gzip.
+    
+    Args:
+        response_body: JSON response body
+        compressed_body: gzip-compressed JSON response body
+        
+    Returns:
+        Response with the JSON results
+    """
+    if request.accept_encodings.quality('gzip') > 0:
+        response = Response(compressed_body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(response_body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Schema of the optimization request parameters: name -> (allowed types, minimum value or None)
+# Types are compared exactly, so that a bool is not accepted as an int
+_OPTIMIZER_PARAM_SCHEMA = {
+    'num_vehicles': ((int,), 1),
+    'num_depots': ((int,), 2),  # Routes run between two different depots
+    'num_parkings': ((int,), 0),
+    'num_routes_per_day': ((int,), 1),
+    'planning_days': ((int,), 1),
+    'seed': ((int, type(None)), 0),  # None generates random data
+    'time_limit': ((int, float), 1),
+    'use_cached': ((bool,), None),
+    'regenerate': ((bool,), None)
+}
+
+def parse_request_params(defaults):
+    """
+    Read the parameters of a request from its JSON body and merge them over the defaults.
+    
+    Parameters that are not in the defaults are ignored.
+    
+    Args:
+        defaults: Dict of parameter names (keys of _OPTIMIZER_PARAM_SCHEMA) to default values
+        
+    Returns:
+        Dict of parameters
+        
+    Raises:
+        ValueError: If the body is not a JSON object, or contains a value of a type not
+            allowed by the schema or a value below the minimum
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        if request.get_data():
+            raise ValueError("Request body must be valid JSON")
+        data = {}
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    params = dict(defaults)
+    for name, value in data.items():
+        if name not in defaults:
+            # Parameters the endpoint doesn't take are ignored
+            app.logger.debug(f"Ignoring unknown request parameter: {name}")
+            continue
+        
+        allowed_types, minimum = _OPTIMIZER_PARAM_SCHEMA[name]
+        if type(value) not in allowed_types:
+            type_names = " or ".join("null" if allowed_type is type(None) else allowed_type.__name__
+                                     for allowed_type in allowed_types)
+            raise ValueError(f"Parameter {name} must be of type {type_names}")
+        if minimum is not None and value is not None and value < minimum:
+            raise ValueError(f"Parameter {name} must be at least {minimum}")
+        params[name] = value
+    return params
+
+def get_optimizer_executor():
+    """
+    Get the executor of the optimization jobs, creating it on first use.
+    
+    The executor is created lazily, in the process that serves the requests (e.g. a gunicorn worker
+    after it has been forked), not when the module is imported. Its worker process is started by a
+    forkserver, as forking the multithreaded server process could copy locks held by other threads.
+    
+    Returns:
+        ProcessPoolExecutor with a single worker process
+    """
+    global _OPTIMIZER_EXECUTOR
+    with _OPTIMIZER_EXECUTOR_LOCK:
+        if _OPTIMIZER_EXECUTOR is None:
+            _OPTIMIZER_EXECUTOR = ProcessPoolExecutor(max_workers=1,
+                                                      mp_context=multiprocessing.get_context('forkserver'))
+        return _OPTIMIZER_EXECUTOR
+
+def record_job_finished(job_id, future):
+    """Record the time an optimization job finished (done callback of its future)."""
+    with _OPTIMIZER_JOBS_LOCK:
+        if job_id in _OPTIMIZER_JOBS:
+            _OPTIMIZER_JOB_FINISH_TIMES[job_id] = time.monotonic()
+
+def evict_expired_jobs():
+    """Drop the jobs that finished more than _OPTIMIZER_JOB_TTL_SECONDS ago (call with _OPTIMIZER_JOBS_LOCK held)."""
+    now = time.monotonic()
+    expired_job_ids = [
+        job_id for job_id, finished_at in _OPTIMIZER_JOB_FINISH_TIMES.items()
+        if now - finished_at > _OPTIMIZER_JOB_TTL_SECONDS
+    ]
+    for job_id in expired_job_ids:
+        del _OPTIMIZER_JOB_FINISH_TIMES[job_id]
+        del _OPTIMIZER_JOBS[job_id]
+
+@app.route('/run_optimizer/status/<job_id>')
+def run_optimizer_status(job_id):
+    """
+    API endpoint to poll an optimization job started by /run_optimizer.
+    
+    Returns:
+        JSON response with the job status while it is running, or the optimization
+        results (or error message) once it has finished
+    """
+    with _OPTIMIZER_JOBS_LOCK:
+        future = _OPTIMIZER_JOBS.get(job_id)
+        if future is not None and future.done():
+            # The results are returned once
+            del _OPTIMIZER_JOBS[job_id]
+            _OPTIMIZER_JOB_FINISH_TIMES.pop(job_id, None)
+    
+    if future is None:
+        return jsonify({
+            'status': 'error',
+            'error': 'Job not found',
+            'message': f"No optimization job with ID {job_id}"
+        }), 404
+    
+    if not future.done():
+        return jsonify({
+            'job_id': job_id,
+            'status': 'running'
+        })
+    
+    try:
+        return jsonify(future.result())
+    
+    except Exception as e:
+        # Log the error
+        app.logger.error(f"Error in optimization job {job_id}: {str(e)}")
+        
+        # Return error response
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'message': 'An error occurred while running the optimization'
+        }), 500
+
+def run_optimization_job(params):
+    """
+    Generate data and run the optimization model (executed in a worker process).
+    
+    The optimization writes the schedule to the cached results file (output/schedule_results.json).
+    
+    Args:
+        params: Request parameters of /run_optimizer
+        
+    Returns:
+        Formatted results for the frontend
+    """
+    # Generate data and run the optimization model
+    # (regenerating always runs a new optimization)
+    results = compute_optimization(params, refresh=params['regenerate'])
+    
+    # The schedule (vehicles and optimization info) is only available if a solution was found;
+    # otherwise report the solver status without vehicles
+    schedule_results = results.get('schedule_results')
+    if schedule_results is None:
+        schedule_results = {
+            'optimization_info': {
+                'status': results['status'],
+                'wall_time': results['wall_time'],
+                'objective_value': None
+            }
+        }
+    
+    # Format the schedule for the frontend
+    return format_results_for_frontend(schedule_results)
+
+def compute_optimization(params, refresh=False):
+    """
+    Generate dummy data and run the optimization model, reusing the data and results of an
+    earlier run with the same parameters.
+    
+    The output files (data summary and schedule results) always describe the returned results:
+    when results are reused, the files are only rewritten if they were last written for other
+    parameters (or by another process).
+    
+    Args:
+        params: Dict with num_vehicles, num_depots, num_parkings, num_routes_per_day,
+            planning_days, seed and time_limit
+        refresh: Whether to run the optimization again even if results for the parameters are
+            cached (the cache entry is replaced)
+        
+    Returns:
+        Optimization results (shared between calls, so they must not be modified)
+    """
+    global _OPTIMIZATION_FILES_WRITTEN
+    cache_key = tuple(params[name] for name in _OPTIMIZATION_CACHE_PARAMS)
+    
+    # Without a seed the data is random, so the results cannot be reused
+    cacheable = params['seed'] is not None
+    
+    cached = None
+    if cacheable and not refresh:
+        with _OPTIMIZATION_CACHE_LOCK:
+            cached = _OPTIMIZATION_CACHE.get(cache_key)
+            if cached is not None:
+                _OPTIMIZATION_CACHE.move_to_end(cache_key)
+    
+    if cached is not None:
+        dummy_data, results = cached
+        
+        # Rewrite the output files for the reused data and results unless they are still in place
+        with _OPTIMIZATION_CACHE_LOCK:
+            if _OPTIMIZATION_FILES_WRITTEN != (cache_key, get_data_summary_mtime()):
+                generate_data_summary(dummy_data)
+                if 'schedule_results' in results:
+                    os.makedirs('output', exist_ok=True)
+                    dump_json(results['schedule_results'], os.path.join('output', 'schedule_results.json'))
+                _OPTIMIZATION_FILES_WRITTEN = (cache_key, get_data_summary_mtime())
+        return results
+    
+    # Generate dummy data
+    dummy_data = generate_dummy_data(
+        num_vehicles=params['num_vehicles'],
+        num_depots=params['num_depots'],
+        num_parkings=params['num_parkings'],
+        num_routes_per_day=params['num_routes_per_day'],
+        planning_days=params['planning_days'],
+        seed=params['seed']
+    )
+    
+    # Generate data summary
+    generate_data_summary(dummy_data)
+    
+    # Run the optimization model (this also writes the schedule results file)
+    results = solve_rail_optimization(dummy_data, time_limit_seconds=params['time_limit'])
+    
+    with _OPTIMIZATION_CACHE_LOCK:
+        if cacheable:
+            _OPTIMIZATION_CACHE[cache_key] = (dummy_data, results)
+            _OPTIMIZATION_CACHE.move_to_end(cache_key)
+            if len(_OPTIMIZATION_CACHE) > _OPTIMIZATION_CACHE_SIZE:
+                _OPTIMIZATION_CACHE.popitem(last=False)
+        
+        # Random data (without a seed) is not cached, so its files can't be matched to a cache entry
+        _OPTIMIZATION_FILES_WRITTEN = (cache_key, get_data_summary_mtime()) if cacheable else None
+    
+    return results
+
+def get_data_summary_mtime():
+    """Get the modification time (in nanoseconds) of the data summary file, or None if it doesn't exist."""
+    try:
+        return os.stat(os.path.join('output', 'data_summary.json')).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def load_cached_results(results_file):
+    """
+    Load the results file, format it for the frontend and serialize it, reusing
+    the serialized results as long as the file is unchanged.
+    
+    Args:
+        results_file: Path to the schedule_results.json file
+        
+    Returns:
+        Tuple of (JSON response body, gzip-compressed JSON response body, ETag) with the formatted results
+        
+    Raises:
+        FileNotFoundError: If the results file doesn't exist
+    """
+    stat = os.stat(results_file)
+    cache_key = (results_file, stat.st_mtime_ns, stat.st_size)
+    cached_bodies = _RESULTS_CACHE.get(cache_key)
+    if cached_bodies is None:
+        # Format the vehicles one at a time as they are read from the file
+        results, vehicle_entries = load_json_streamed(results_file, ['optimization_info'], 'vehicles')
+        frontend_results = format_results_for_frontend(results, vehicle_entries)
+        response_body = f"{app.json.dumps(frontend_results)}\n".encode()
+        etag = hashlib.blake2b(response_body, digest_size=8).hexdigest()
+        cached_bodies = (response_body, gzip.compress(response_body, compresslevel=6), etag)
+        
+        # Only the latest version of the file is kept
+        _RESULTS_CACHE.clear()
+        _RESULTS_CACHE[cache_key] = cached_bodies
+    return cached_bodies
+
+# Fields read from the route assignments and maintenance activities of the results, with their defaults
+_ROUTE_DEFAULTS = {'route_id': '', 'start_location': '', 'end_location': '', 'distance_km': 0}
+_MAINTENANCE_DEFAULTS = {
+    'maintenance_id': '',
+    'maintenance_type': '',
+    'depot': '',
+    'km_at_start': 0,
+    'start_day': 1,
+    'start_shift': 'day',
+    'end_day': 1,
+    'end_shift': 'day'
+}
+_get_route_fields = operator.itemgetter('route_id', 'start_location', 'end_location', 'distance_km')
+_get_maintenance_fields = operator.itemgetter('maintenance_id', 'maintenance_type', 'depot', 'km_at_start')
+_get_maintenance_shift_fields = operator.itemgetter('start_day', 'start_shift', 'end_day', 'end_shift')
+
+def parse_shift_index(shift_key):
+    """
+    Convert a shift key (e.g., "1_day" or "1_night") into a zero-based shift index.
+    
+    Args:
+        shift_key: Shift key in the format "<day>_<shift>"
+        
+    Returns:
+        Shift index (day shifts are even, night shifts are odd)
+    """
+    day, shift = shift_key.split('_', 1)
+    return (int(day) - 1) * 2 + (0 if shift == 'day' else 1)
+
+def format_route(route_data, shift_index):
+    """
+    Format a route assignment for the frontend.
+    
+    Args:
+        route_data: Route assignment from schedule_results.json
+        shift_index: Zero-based index of the shift of the route
+        
+    Returns:
+        Formatted route
+    """
+    # Missing fields take their defaults
+    route_id, start_location, end_location, distance_km = _get_route_fields({**_ROUTE_DEFAULTS, **route_data})
+    return {
+        'route_id': route_id,
+        'start_location': start_location,
+        'end_location': end_location,
+        'km': distance_km,
+        'shift': shift_index
+    }
+
+def format_maintenance(i, maintenance):
+    """
+    Format a maintenance activity for the frontend.
+    
+    Args:
+        i: Position of the activity in the vehicle's maintenance activities
+        maintenance: Maintenance activity from schedule_results.json
+        
+    Returns:
+        Tuple of (unique activity ID, formatted maintenance activity)
+    """
+    # Fill in the defaults of missing fields once
+    maintenance = {**_MAINTENANCE_DEFAULTS, **maintenance}
+    maintenance_id, maintenance_type, depot, km_at_start = _get_maintenance_fields(maintenance)
+    
+    if 'start_idx' in maintenance:
+        # Use the optimizer's shift indices (shifted by one to skip the initial state)
+        start_shift_index = maintenance['start_idx'] - 1
+        end_shift_index = maintenance['end_idx'] - 1
+    else:
+        # Parse shift data
+        start_day, start_shift, end_day, end_shift = _get_maintenance_shift_fields(maintenance)
+        
+        # Convert to shift indices
+        start_shift_index = (start_day - 1) * 2 + (0 if start_shift == 'day' else 1)
+        end_shift_index = (end_day - 1) * 2 + (0 if end_shift == 'day' else 1)
+    
+    # Create a unique ID for each maintenance activity
+    return f"{maintenance_id}_activity_{i}", {
+        'maintenance_type': maintenance_type,
+        'start_shift': start_shift_index,
+        'end_shift': end_shift_index,
+        'depot': depot,
+        'km': km_at_start
+    }
+
+def format_results_for_frontend(results, vehicle_entries=None):
     """
     Format the optimization results for the frontend visualization.
     
     Args:
         results: Raw optimization results from schedule_results.json
+        vehicle_entries: Optional iterable of (vehicle_id, vehicle_data) pairs to format instead
+            of results['vehicles'] (e.g. streamed from the results file)
         
     Returns:
         Formatted results for the frontend
     """
-    # Get optimization info
+    # Count total routes and maintenance activities
+    total_routes = 0
+    total_maintenance = 0
+    
+    vehicles_data = {}
+    
+    # All vehicles share the same shift keys, so each key is parsed once and looked up afterwards
+    shift_indices = {}
+    
+    if vehicle_entries is None:
+        vehicle_entries = results['vehicles'].items() if 'vehicles' in results else []
+    
+    for vehicle_id, vehicle_data in vehicle_entries:
+        # Parse the shift keys that haven't been seen for an earlier vehicle
+        route_assignments = vehicle_data.get('route_assignments', {})
+        for shift_key in route_assignments:
+            if shift_key not in shift_indices:
+                shift_indices[shift_key] = parse_shift_index(shift_key)
+        
+        # Process route assignments (skipping null routes) and maintenance activities
+        vehicle_routes = {
+            shift_key: format_route(route_data, shift_indices[shift_key])
+            for shift_key, route_data in route_assignments.items()
+            if route_data
+        }
+        vehicle_maintenance = dict(
+            format_maintenance(i, maintenance)
+            for i, maintenance in enumerate(vehicle_data.get('maintenance_activities', []))
+        )
+        
+        # Add the vehicle in the output format
+        vehicles_data[vehicle_id] = {
+            'routes': vehicle_routes,
+            'maintenance': vehicle_maintenance,
+            'initial_km': vehicle_data.get('initial_state', {}).get('km', 0)
+        }
+        
+        total_routes += len(vehicle_routes)
+        total_maintenance += len(vehicle_maintenance)
+    
+    # Get optimization info (after the vehicles, as a streamed results file may only
+    # provide it once all vehicle entries have been read)
     if 'optimization_info' in results:
         status = results['optimization_info'].get('status', 'OPTIMAL')
         wall_time = results['optimization_info'].get('wall_time', 0)
@@ -156,69 +674,6 @@ def format_results_for_frontend(results):
         wall_time = 0.6
         objective_value = 0
     
-    # Count total routes and maintenance activities
-    total_routes = 0
-    total_maintenance = 0
-    
-    vehicles_data = {}
-    
-    if 'vehicles' in results:
-        for vehicle_id, vehicle_data in results['vehicles'].items():
-            # Initialize vehicle in the output format
-            vehicles_data[vehicle_id] = {
-                'routes': {},
-                'maintenance': {},
-                'initial_km': vehicle_data.get('initial_state', {}).get('km', 0)
-            }
-            
-            # Process route assignments
-            route_assignments = vehicle_data.get('route_assignments', {})
-            for shift_key, route_data in route_assignments.items():
-                if route_data:  # Skip null routes
-                    # Parse shift (e.g., "1_day" or "1_night")
-                    parts = shift_key.split('_')
-                    day = int(parts[0])
-                    is_day = parts[1] == 'day'
-                    shift_index = (day - 1) * 2 + (0 if is_day else 1)
-                    
-                    # Add route to the vehicle data
-                    vehicles_data[vehicle_id]['routes'][shift_key] = {
-                        'route_id': route_data.get('route_id', ''),
-                        'start_location': route_data.get('start_location', ''),
-                        'end_location': route_data.get('end_location', ''),
-                        'km': route_data.get('distance_km', 0),
-                        'shift': shift_index
-                    }
-                    
-                    total_routes += 1
-            
-            # Process maintenance activities
-            maintenance_activities = vehicle_data.get('maintenance_activities', [])
-            for i, maintenance in enumerate(maintenance_activities):
-                # Create a unique ID for each maintenance activity
-                maint_id = f"{maintenance.get('maintenance_id', '')}_activity_{i}"
-                
-                # Parse shift data
-                start_day = maintenance.get('start_day', 1)
-                start_shift = maintenance.get('start_shift', 'day')
-                end_day = maintenance.get('end_day', 1)
-                end_shift = maintenance.get('end_shift', 'day')
-                
-                # Convert to shift indices
-                start_shift_index = (start_day - 1) * 2 + (0 if start_shift == 'day' else 1)
-                end_shift_index = (end_day - 1) * 2 + (0 if end_shift == 'day' else 1)
-                
-                # Add maintenance to the vehicle data
-                vehicles_data[vehicle_id]['maintenance'][maint_id] = {
-                    'maintenance_type': maintenance.get('maintenance_type', ''),
-                    'start_shift': start_shift_index,
-                    'end_shift': end_shift_index,
-                    'depot': maintenance.get('depot', ''),
-                    'km': maintenance.get('km_at_start', 0)
-                }
-                
-                total_maintenance += 1
-    
     # Create the final output structure
     frontend_results = {
         'status': status,
@@ -231,5 +686,8 @@ def format_results_for_frontend(results):
     
     return frontend_results
 
+# Import routes once this module is fully initialized (routes imports the app and its helpers from it)
+from webapp import routes
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
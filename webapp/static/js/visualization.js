@@ -4,6 +4,11 @@
  * Handles API calls to the optimizer and renders the schedule visualization.
  */
 
+// Cached results last received from the server and their ETag (sent back so that unchanged
+// cached results are not transferred again)
+let cachedResults = null;
+let cachedResultsEtag = null;
+
 /**
  * Run the optimization and display results
  * @param {boolean} useCached - Whether to use cached results (default: true)
@@ -30,24 +35,25 @@ function runOptimization(useCached = true, regenerate = false) {
         num_parkings: 1,
         num_routes_per_day: 4,
         planning_days: 7,
+        seed: 46,               // Instance with a feasible schedule
         time_limit: 30,         // 30 seconds time limit
         use_cached: useCached,  // Whether to use cached results
         regenerate: regenerate  // Whether to regenerate data
     };
     
-    // Make API call to run the optimizer
-    fetch('/run_optimizer', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(params)
-    })
-    .then(response => {
-        if (!response.ok) {
-            throw new Error(`HTTP error! Status: ${response.status}`);
+    // Get the cached results (unless a fresh optimization is requested), and run the optimizer if
+    // there are none
+    const resultsRequest = (useCached && !regenerate)
+        ? fetchCachedResults().then(data => data || startOptimization(params))
+        : startOptimization(params);
+    
+    resultsRequest
+    .then(data => {
+        // A new optimization runs in the background: poll its job until it has finished
+        if (data && data.job_id) {
+            return pollOptimizationJob(data.job_id);
         }
-        return response.json();
+        return data;
     })
     .then(data => {
         // Hide loading spinner
@@ -90,6 +96,84 @@ function runOptimization(useCached = true, regenerate = false) {
     });
 }
 
+/**
+ * Get the cached results of the last optimization
+ * @returns {Promise<Object|null>} The cached results, or null if there are none
+ */
+function fetchCachedResults() {
+    // Send the ETag of the results received before, so that unchanged results are not transferred again
+    const headers = {};
+    if (cachedResultsEtag) {
+        headers['If-None-Match'] = cachedResultsEtag;
+    }
+    
+    return fetch('/run_optimizer/cached', { headers: headers })
+    .then(response => {
+        // The cached results haven't changed since they were last received
+        if (response.status === 304 && cachedResults) {
+            return cachedResults;
+        }
+        if (response.status === 404) {
+            return null;
+        }
+        if (!response.ok) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        const etag = response.headers.get('ETag');
+        return response.json().then(data => {
+            if (etag) {
+                cachedResults = data;
+                cachedResultsEtag = etag;
+            }
+            return data;
+        });
+    });
+}
+
+/**
+ * Make an API call to run the optimizer
+ * @param {Object} params - Optimization parameters
+ * @returns {Promise<Object>} The results, or the ID of the background optimization job
+ */
+function startOptimization(params) {
+    return fetch('/run_optimizer', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(params)
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        return response.json();
+    });
+}
+
+/**
+ * Poll a background optimization job until it has finished
+ * @param {string} jobId - ID of the job returned by /run_optimizer
+ * @param {number} interval - Polling interval in milliseconds (default: 1000)
+ * @returns {Promise<Object>} The optimization results (or error response)
+ */
+function pollOptimizationJob(jobId, interval = 1000) {
+    return fetch(`/run_optimizer/status/${jobId}`)
+    .then(response => {
+        if (!response.ok && response.status !== 500) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data && data.status === 'running') {
+            return new Promise(resolve => setTimeout(resolve, interval))
+                .then(() => pollOptimizationJob(jobId, interval));
+        }
+        return data;
+    });
+}
+
 /**
  * Display the optimization results in the provided container
  */